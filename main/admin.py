@@ -1,7 +1,10 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.db import transaction
 from django.utils.html import format_html
+from . import final_results, session_cache
 from .models import (
-    VotingSession, ElectionPosition, ElectionCandidate, AnonymousElectionVote,
+    VotingSession, ElectionPosition, ElectionCandidate, ElectionCandidateTally, AnonymousElectionVote,
+    FinalElectionResult,
     Department, Huel, HuelRating, HuelComment,
     DepartmentClub, DepartmentClubVote, DepartmentClubComment,
     UserProfile
@@ -17,7 +20,7 @@ class VotingSessionAdmin(admin.ModelAdmin):
     ]
     list_filter = ['voting_type', 'is_active', 'created_at']
     search_fields = ['name']
-    readonly_fields = ['created_at', 'updated_at', 'created_by']
+    readonly_fields = ['created_at', 'updated_at', 'created_by', 'votes_archived_at', 'results_finalized_at']
     
     fieldsets = [
         ('Basic Information', {
@@ -35,12 +38,12 @@ class VotingSessionAdmin(admin.ModelAdmin):
             'classes': ['collapse']
         }),
         ('Metadata', {
-            'fields': ['created_at', 'updated_at', 'created_by'],
+            'fields': ['created_at', 'updated_at', 'created_by', 'votes_archived_at', 'results_finalized_at'],
             'classes': ['collapse']
         })
     ]
     
-    actions = ['activate_voting', 'deactivate_voting']
+    actions = ['activate_voting', 'deactivate_voting', 'finalize_results']
     
     def status_display(self, obj):
         status, message = obj.get_current_status()
@@ -58,14 +61,40 @@ class VotingSessionAdmin(admin.ModelAdmin):
     status_display.short_description = 'Current Status'
     
     def activate_voting(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        voting_types = list(queryset.values_list('voting_type', flat=True))
+        if len(voting_types) != len(set(voting_types)):
+            self.message_user(request, 'Only one session per voting type can be active.', level=messages.ERROR)
+            return
+        with transaction.atomic():
+            # Activating a session closes the previously active one of the same type
+            VotingSession.objects.filter(
+                voting_type__in=voting_types, is_active=True
+            ).exclude(pk__in=queryset.values('pk')).update(is_active=False)
+            updated = queryset.update(is_active=True)
+            # update() sends no post_save signal
+            session_cache.invalidate()
         self.message_user(request, f'{updated} voting session(s) activated.')
     activate_voting.short_description = 'Activate selected voting sessions'
     
     def deactivate_voting(self, request, queryset):
         updated = queryset.update(is_active=False)
+        session_cache.invalidate()
         self.message_user(request, f'{updated} voting session(s) deactivated.')
     deactivate_voting.short_description = 'Deactivate selected voting sessions'
+
+    def finalize_results(self, request, queryset):
+        finalized = 0
+        for session in queryset:
+            if session.voting_type != 'su_election' or not final_results.can_finalize(session):
+                self.message_user(
+                    request, f'{session.name}: only ended or deactivated SU elections can be finalized.',
+                    level=messages.WARNING
+                )
+                continue
+            if final_results.finalize(session):
+                finalized += 1
+        self.message_user(request, f'{finalized} election result(s) finalized.')
+    finalize_results.short_description = 'Freeze final results of selected elections'
     
     def save_model(self, request, obj, form, change):
         if not change:  # Only set created_by for new objects
@@ -93,9 +122,10 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(ElectionPosition)
 class ElectionPositionAdmin(admin.ModelAdmin):
-    list_display = ['name', 'candidate_count', 'total_votes', 'is_active', 'created_at']
+    list_display = ['name', 'slug', 'candidate_count', 'total_votes', 'is_active', 'created_at']
     list_filter = ['is_active', 'created_at']
     search_fields = ['name']
+    prepopulated_fields = {'slug': ['name']}
     readonly_fields = ['created_at']
     
     def candidate_count(self, obj):
@@ -103,12 +133,12 @@ class ElectionPositionAdmin(admin.ModelAdmin):
     candidate_count.short_description = 'Active Candidates'
     
     def total_votes(self, obj):
-        return sum(candidate.vote_count for candidate in obj.candidates.all())
+        return ElectionCandidateTally.merged_view()['positions'].get(obj.id, 0)
     total_votes.short_description = 'Total Votes'
 
 @admin.register(ElectionCandidate)
 class ElectionCandidateAdmin(admin.ModelAdmin):
-    list_display = ['name', 'position', 'party', 'vote_count', 'vote_percentage', 'is_active']
+    list_display = ['name', 'position', 'party', 'live_vote_count', 'vote_percentage', 'is_active']
     list_filter = ['position', 'party', 'is_active', 'created_at']
     search_fields = ['name', 'party']
     readonly_fields = ['vote_count', 'created_at']
@@ -117,6 +147,10 @@ class ElectionCandidateAdmin(admin.ModelAdmin):
         'image', 'vote_count', 'is_active', 'created_at'
     ]
     
+    def live_vote_count(self, obj):
+        return obj.get_live_vote_count()
+    live_vote_count.short_description = 'Votes'
+
     def vote_percentage(self, obj):
         return f"{obj.get_vote_percentage()}%"
     vote_percentage.short_description = 'Vote %'
@@ -127,7 +161,7 @@ class AnonymousElectionVoteAdmin(admin.ModelAdmin):
     list_display = ['voter_hash_short', 'candidate', 'position', 'voted_at', 'signature_valid']
     list_filter = ['position', 'voted_at']
     search_fields = ['candidate__name']
-    readonly_fields = ['voter_hash', 'vote_signature', 'voted_at', 'ip_hash']
+    readonly_fields = ['voter_hash', 'vote_signature', 'voted_at', 'ip_hash', 'log_index']
     
     def voter_hash_short(self, obj):
         """Show only first 8 characters of hash for privacy"""
@@ -138,7 +172,7 @@ class AnonymousElectionVoteAdmin(admin.ModelAdmin):
         """Verify vote signature integrity"""
         expected_signature = AnonymousElectionVote.create_vote_signature(
             obj.voter_hash, 
-            obj.candidate.id, 
+            obj.candidate_id, 
             obj.voted_at.isoformat()
         )
         is_valid = obj.vote_signature == expected_signature
@@ -157,6 +191,24 @@ class AnonymousElectionVoteAdmin(admin.ModelAdmin):
         """Prevent deletion of anonymous votes to maintain audit trail"""
         return False
 
+@admin.register(FinalElectionResult)
+class FinalElectionResultAdmin(admin.ModelAdmin):
+    list_display = ['candidate_name', 'position_name', 'session', 'votes', 'percentage', 'rank']
+    list_filter = ['session', 'position_name']
+    list_select_related = ['session']
+
+    def has_add_permission(self, request):
+        """Final results are only written by finalization"""
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        """Final results are immutable"""
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        """Final results are immutable"""
+        return False
+
 # ========== HUEL ADMIN ==========
 
 @admin.register(Department)
@@ -177,12 +229,12 @@ class HuelAdmin(admin.ModelAdmin):
     list_filter = ['department', 'is_active', 'created_at']
     search_fields = ['code', 'name', 'instructor']
     readonly_fields = [
-        'avg_grading', 'avg_toughness', 'avg_overall', 
+        'avg_grading', 'avg_toughness', 'avg_overall', 'rating_count', 'combined_score',
         'created_at', 'updated_at'
     ]
     fields = [
         'code', 'name', 'department', 'instructor', 'description',
-        'avg_grading', 'avg_toughness', 'avg_overall',
+        'avg_grading', 'avg_toughness', 'avg_overall', 'rating_count', 'combined_score',
         'is_active', 'created_at', 'updated_at'
     ]
     
@@ -199,10 +251,6 @@ class HuelAdmin(admin.ModelAdmin):
         )
     avg_overall_display.short_description = 'Overall Rating'
     
-    def rating_count(self, obj):
-        return obj.ratings.count()
-    rating_count.short_description = 'Ratings'
-    
 
 @admin.register(HuelRating)
 class HuelRatingAdmin(admin.ModelAdmin):
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MainConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'main'
+
+    def ready(self):
+        # Connects the cache invalidation signals
+        from . import huel_suggest, live_results, position_registry, session_cache  # noqa: F401
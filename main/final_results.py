@@ -0,0 +1,143 @@
+"""
+Frozen results of finished SU elections.
+
+Once a session has ended its tallies can't change, so they are computed once
+into FinalElectionResult and the results endpoints serve those rows instead of
+live aggregates. The finalize_election_results command freezes them once
+voting_end_time has passed (run it with --loop during the election), and the
+admin does it for sessions that were closed by hand; requests never do.
+Response payloads built from the frozen rows are kept in this worker's memory
+for good, since nothing can invalidate them.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from . import position_registry, session_cache
+from .models import (
+    VotingSession, ElectionCandidate, ElectionCandidateTally,
+    StagedElectionVote, FinalElectionResult
+)
+
+_payloads = {}  # {(session_id, name): payload} built by this worker
+
+# ========== FINALIZATION ==========
+
+def can_finalize(session):
+    """Results can be frozen once voting has ended or been switched off"""
+    status, _ = session.get_current_status()
+    return status in ('ended', 'inactive')
+
+def finalize(session):
+    """
+    Write the final per-candidate results of a session once.
+    Returns True if they were written now, False if they already existed.
+    """
+    # Drain the ingestion queue before taking the lock, which then only waits for stragglers
+    while StagedElectionVote.drain():
+        pass
+
+    with transaction.atomic():
+        session = VotingSession.objects.select_for_update().get(pk=session.pk)
+        if session.results_finalized_at is not None:
+            return False
+
+        # Ballots still waiting in the ingestion queue are part of the result
+        while StagedElectionVote.drain():
+            pass
+
+        live_counts = ElectionCandidateTally.merged_view(use_cache=False)['candidates']
+        by_position = {}
+        candidates = ElectionCandidate.objects.filter(
+            is_active=True, position__is_active=True
+        ).select_related('position')
+        for candidate in candidates:
+            votes = live_counts.get(candidate.id, candidate.vote_count)
+            by_position.setdefault(candidate.position_id, []).append((votes, candidate))
+
+        results = []
+        for entries in by_position.values():
+            entries.sort(key=lambda entry: (-entry[0], entry[1].id))
+            total_votes = sum(votes for votes, _ in entries)
+            for votes, candidate in entries:
+                results.append(FinalElectionResult(
+                    session=session,
+                    position=candidate.position,
+                    candidate=candidate,
+                    position_name=candidate.position.name,
+                    candidate_name=candidate.name,
+                    votes=votes,
+                    position_total_votes=total_votes,
+                    percentage=round((votes / total_votes) * 100, 1) if total_votes else 0,
+                    # Tied candidates share a rank
+                    rank=1 + sum(1 for other_votes, _ in entries if other_votes > votes),
+                ))
+
+        FinalElectionResult.objects.bulk_create(results)
+        session.results_finalized_at = timezone.now()
+        session.save(update_fields=['results_finalized_at'])
+    return True
+
+def ended_sessions():
+    """SU election sessions past voting_end_time whose results aren't frozen yet"""
+    sessions = VotingSession.objects.filter(voting_type='su_election', results_finalized_at__isnull=True)
+    return [session for session in sessions if session.get_current_status()[0] == 'ended']
+
+def finalized_session():
+    """The current SU election session if its results are frozen, or None while results are live"""
+    session = session_cache.current('su_election')
+    if session is not None and session.results_finalized_at is not None:
+        return session
+    return None
+
+# ========== PAYLOADS ==========
+
+def get_payload(session, name, builder):
+    """Payload `name` for a finalized session, built once per worker by builder(session)"""
+    key = (session.id, name)
+    if key not in _payloads:
+        _payloads[key] = builder(session)
+    return _payloads[key]
+
+def _results(session):
+    return list(
+        FinalElectionResult.objects.filter(session=session)
+        .select_related('position').order_by('position_id', 'rank', 'candidate_id')
+    )
+
+def live_stats(session):
+    """Final results in the elections/live-stats/ response format"""
+    results = _results(session)
+    position_totals = {result.position_id: result.position_total_votes for result in results}
+    payload = {
+        'total_voters': get_user_model().objects.filter(is_active=True).count(),
+        'total_votes_cast': sum(position_totals.values()),
+    }
+    payload.update(position_registry.empty_response(lambda: {'total_votes': 0, 'candidates': []}))
+
+    for result in results:
+        key = position_registry.response_key(result.position.slug)
+        payload.setdefault(key, {'total_votes': 0, 'candidates': []})
+        payload[key]['total_votes'] = result.position_total_votes
+        payload[key]['candidates'].append({
+            'name': result.candidate_name,
+            'votes': result.votes,
+            'percentage': result.percentage,
+        })
+    return payload
+
+def election_stats(session):
+    """Final results in the dashboard election_stats format"""
+    stats = {}
+    for result in _results(session):
+        position = stats.setdefault(result.position_name, {'total_votes': result.position_total_votes, 'candidates': 0})
+        position['candidates'] += 1
+    return stats
+
+def vote_counts(session):
+    """(votes by candidate id, total votes by position id) of a finalized session"""
+    counts, totals = {}, {}
+    for result in _results(session):
+        counts[result.candidate_id] = result.votes
+        totals[result.position_id] = result.position_total_votes
+    return counts, totals
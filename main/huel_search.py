@@ -0,0 +1,70 @@
+"""
+Ranked, index-backed search over the HUEL catalogue.
+
+On PostgreSQL a huel matches when any of these hold, each served by a GIN index
+from migration 0019:
+- every word of the query prefix-matches the full-text document built from
+  code, name and instructor ("prog" finds "Computer Programming"),
+- the query with spaces and punctuation removed is part of the huel's
+  search_key, so "hss222" finds "HSS F222",
+- the query is trigram-similar to the search_key, or to a run of words in the
+  name and instructor, which tolerates typos ("programing", "hs222").
+Matches are annotated with search_rank, the best of the text rank and the two
+similarities. Other databases (SQLite in development) fall back to icontains
+filters plus the search_key match, with a constant rank.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Huel
+
+def _column(name):
+    return f'{connection.ops.quote_name(Huel._meta.db_table)}.{connection.ops.quote_name(name)}'
+
+# Must stay identical to the indexed expressions in migration 0019
+DOCUMENT = f"to_tsvector('simple', {_column('code')} || ' ' || {_column('name')} || ' ' || {_column('instructor')})"
+TEXT = f"lower({_column('name')} || ' ' || {_column('instructor')})"
+SEARCH_KEY = _column('search_key')
+
+def tokens(term):
+    """Lowercase words of a query, letters and digits only"""
+    return re.findall(r'[^\W_]+', term.lower())
+
+def search(queryset, term):
+    """Filter a Huel queryset down to matches for term, annotated with search_rank"""
+    words = tokens(term)
+    if not words:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+    compact = ''.join(words)
+
+    if connection.vendor != 'postgresql':
+        return queryset.filter(
+            Q(code__icontains=term) |
+            Q(name__icontains=term) |
+            Q(instructor__icontains=term) |
+            Q(search_key__contains=compact)
+        ).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    prefix_query = ' & '.join(f'{word}:*' for word in words)
+    text = ' '.join(words)
+    # Literal % is doubled because the SQL carries parameters
+    matches = RawSQL(
+        f"{DOCUMENT} @@ to_tsquery('simple', %s)"
+        f" OR {SEARCH_KEY} LIKE '%%' || %s || '%%'"
+        f" OR {SEARCH_KEY} %% %s"
+        f" OR %s <%% {TEXT}",
+        (prefix_query, compact, compact, text),
+        output_field=BooleanField(),
+    )
+    # The functions return real; as double precision the rank reaches Python exactly,
+    # so a pagination cursor holding it compares equal to the row it came from
+    rank = RawSQL(
+        f"GREATEST(ts_rank({DOCUMENT}, to_tsquery('simple', %s)),"
+        f" similarity({SEARCH_KEY}, %s), word_similarity(%s, {TEXT}))::double precision",
+        (prefix_query, compact, text),
+        output_field=FloatField(),
+    )
+    return queryset.filter(matches).annotate(search_rank=rank)
@@ -0,0 +1,80 @@
+"""
+Per-process prefix index for HUEL typeahead.
+
+Every active huel is loaded with one query and its search keys are kept in this
+worker's memory as three sorted arrays: course codes (the forms in
+Huel.search_key and the code without its leading words, so "f222" suggests
+"HSS F222"), name words and runs, and instructor words and runs. A
+suggestion is a binary search for the typed prefix in each array in that order,
+reading entries until enough distinct huels are found, so it costs
+O(log n + limit) and never touches the database. Saving or deleting a huel
+(signals below) invalidates it; see process_cache for how other workers pick
+the change up. Rating changes don't save the huel and don't affect the index.
+"""
+import bisect
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .huel_search import tokens
+from .models import Huel
+from .process_cache import ProcessCache
+
+def _phrases(text):
+    """Every word of text and every run of words up to its end: "data structures" gives
+    "data structures" and "structures", so a prefix can start at any word"""
+    words = tokens(text)
+    return [' '.join(words[start:]) for start in range(len(words))]
+
+def _sorted_index(entries):
+    entries.sort()
+    return [key for key, _ in entries], [huel_id for _, huel_id in entries]
+
+def _load():
+    codes, names, instructors = [], [], []
+    labels = {}
+    for huel in Huel.objects.filter(is_active=True).only('id', 'code', 'name', 'instructor', 'search_key'):
+        labels[huel.id] = str(huel)
+        code_words = tokens(huel.code)
+        keys = set(huel.search_key.split())
+        keys.update(''.join(code_words[start:]) for start in range(1, len(code_words)))
+        codes += [(key, huel.id) for key in keys]
+        names += [(key, huel.id) for key in _phrases(huel.name)]
+        instructors += [(key, huel.id) for key in _phrases(huel.instructor)]
+    return {
+        'indexes': [_sorted_index(codes), _sorted_index(names), _sorted_index(instructors)],
+        'labels': labels,
+    }
+
+_index = ProcessCache('huel-suggest', _load)
+
+def suggest(term, limit):
+    """Up to limit {'id', 'label'} for huels whose code, name or instructor starts with term"""
+    words = tokens(term)
+    if not words or limit <= 0:
+        return []
+    index = _index.get()
+    # Codes are indexed without spaces, names and instructors with single spaces
+    prefixes = [''.join(words), ' '.join(words), ' '.join(words)]
+
+    found = []
+    seen = set()
+    for (keys, huel_ids), prefix in zip(index['indexes'], prefixes):
+        position = bisect.bisect_left(keys, prefix)
+        while position < len(keys) and keys[position].startswith(prefix):
+            huel_id = huel_ids[position]
+            if huel_id not in seen:
+                seen.add(huel_id)
+                found.append({'id': huel_id, 'label': index['labels'][huel_id]})
+                if len(found) == limit:
+                    return found
+            position += 1
+    return found
+
+def invalidate():
+    _index.invalidate()
+
+@receiver(post_save, sender=Huel)
+@receiver(post_delete, sender=Huel)
+def _huel_changed(sender, **kwargs):
+    invalidate()
@@ -0,0 +1,101 @@
+"""
+Idempotency-Key support for write endpoints.
+
+A client that may retry a POST sends the same Idempotency-Key header with every
+attempt. The first attempt runs the view and its response (status and data
+only) is kept in the shared cache for IDEMPOTENCY_KEY_TTL_SECONDS; retries get
+that response replayed without touching the database. Keys are scoped per
+endpoint and per user, and reusing a key with a different body is rejected.
+Server errors are not stored so the request can be retried for real.
+
+Cache entries name no user and hold no readable request: the cache key is an
+HMAC of scope, user and key, and the body fingerprint an HMAC keyed by the
+Idempotency-Key. Endpoints that record anonymous votes use replay_body=False,
+which keeps only the status of a successful response and replays a generic
+body, so the cache never links a user to a receipt.
+
+Claiming a key relies on cache.add() being atomic across workers, which the
+Redis cache (SET NX) is; the local memory fallback used without REDIS_URL only
+sees the keys of its own process.
+"""
+import functools
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+IN_PROGRESS_SECONDS = 30  # How long a crashed first attempt blocks retries
+
+def _cache_key(scope, request, key):
+    user_id = request.user.id if request.user.is_authenticated else 'anonymous'
+    message = f'{scope}\0{user_id}\0{key}'.encode()
+    return 'idempotency:' + hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+def _fingerprint(request, key):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hmac.new(f'{settings.SECRET_KEY}\0{key}'.encode(), body.encode(), hashlib.sha256).hexdigest()
+
+def _stored_response(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        return Response({
+            "error": f"This {HEADER} was already used for a different request"
+        }, status=422)
+
+    if stored['status'] is None:
+        response = Response({
+            "error": f"A request with this {HEADER} is still being processed"
+        }, status=409)
+        response['Retry-After'] = '1'
+        return response
+
+    data = stored.get('data', {"success": "This request was already processed"})
+    response = Response(data, status=stored['status'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+def idempotent(scope, replay_body=True):
+    """
+    Honour the Idempotency-Key header on a DRF function view. Apply it below
+    @api_view and @permission_classes so it runs after authentication.
+    With replay_body=False only successful responses are kept, without their body.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request.headers.get(HEADER)
+            if not key:
+                return view(request, *args, **kwargs)
+            if len(key) > MAX_KEY_LENGTH:
+                return Response({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"}, status=400)
+
+            cache_key = _cache_key(scope, request, key)
+            fingerprint = _fingerprint(request, key)
+
+            # Claim the key; a concurrent or later attempt finds the marker or the stored response
+            if not cache.add(cache_key, {'fingerprint': fingerprint, 'status': None}, IN_PROGRESS_SECONDS):
+                stored = cache.get(cache_key)
+                if stored is not None:
+                    return _stored_response(stored, fingerprint)
+                # Expired between add and get; run the request normally
+
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception:
+                cache.delete(cache_key)
+                raise
+
+            if not isinstance(response, Response) or response.status_code >= (500 if replay_body else 300):
+                cache.delete(cache_key)
+            else:
+                stored = {'fingerprint': fingerprint, 'status': response.status_code}
+                if replay_body:
+                    stored['data'] = response.data
+                cache.set(cache_key, stored, settings.IDEMPOTENCY_KEY_TTL_SECONDS)
+            return response
+        return wrapper
+    return decorator
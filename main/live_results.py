@@ -0,0 +1,274 @@
+"""
+Live election results snapshot.
+
+The snapshot holds per-position totals, per-candidate counts and percentages and
+a version that changes with every update (a timestamp, so it never repeats even
+if the cache loses it). It lives in the shared cache, so serving results costs a
+cache read instead of COUNT queries. Committed votes are applied to it as
+deltas: each worker collects them in memory and flushes at most once per
+RESULTS_SNAPSHOT_DEBOUNCE_SECONDS, skipping votes the snapshot already counts.
+On PostgreSQL that is decided exactly: the tallies are read in a REPEATABLE READ
+transaction whose snapshot (pg_current_snapshot) is kept with the results, and
+each delta carries the id of the transaction that cast it, so a vote is skipped
+only if that transaction was visible to the tally read. Other databases fall
+back to comparing commit and build times. The snapshot is rebuilt from the tally
+tables when it is missing or older than RESULTS_SNAPSHOT_MAX_AGE_SECONDS, which
+also corrects any delta lost between workers.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import position_registry
+from .models import ElectionPosition, ElectionCandidate, ElectionCandidateTally
+
+SNAPSHOT_CACHE_KEY = 'election:results:snapshot'
+VERSION_CACHE_KEY = 'election:results:version'
+LOCK_CACHE_KEY = 'election:results:lock'
+
+_pending = []  # [(position_id, candidate_id, mark)] not yet flushed by this worker, see record_votes()
+_pending_lock = threading.Lock()
+_flush_timer = None
+_rendered = (None, None)  # (version, rendered results) last served by this worker
+
+# ========== SNAPSHOT ==========
+
+def _percentage(votes, total_votes):
+    if total_votes == 0:
+        return 0
+    return round((votes / total_votes) * 100, 1)
+
+def _update_percentages(position):
+    for candidate in position['candidates'].values():
+        candidate['percentage'] = _percentage(candidate['votes'], position['total_votes'])
+
+def _next_version():
+    # A fresh value rather than a counter, so a lost key can never bring back an old version (and ETag)
+    version = time.time_ns()
+    cache.set(VERSION_CACHE_KEY, version, None)
+    return version
+
+def _parse_pg_snapshot(text):
+    """'xmin:xmax:xip,...' -> (xmin, xmax, frozenset of in-progress xids)"""
+    xmin, xmax, in_progress = text.split(':')
+    return int(xmin), int(xmax), frozenset(int(xid) for xid in in_progress.split(',') if xid)
+
+def _read_tally():
+    """
+    (merged tally, snapshot it was read in). The snapshot is the PostgreSQL
+    transaction snapshot, or None on other databases.
+    """
+    if connection.vendor != 'postgresql':
+        return ElectionCandidateTally.merged_view(use_cache=False), None
+
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if outermost:
+                # Both reads below then see the same snapshot
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ')
+                cursor.execute('SELECT pg_current_snapshot()::text')
+                pg_snapshot = cursor.fetchone()[0]
+                tally = ElectionCandidateTally.merged_view(use_cache=False)
+            else:
+                # Inside the caller's READ COMMITTED transaction: take the snapshot after
+                # the read, so a vote committed in between is left out rather than counted twice
+                tally = ElectionCandidateTally.merged_view(use_cache=False)
+                cursor.execute('SELECT pg_current_snapshot()::text')
+                pg_snapshot = cursor.fetchone()[0]
+    return tally, _parse_pg_snapshot(pg_snapshot)
+
+def _counted(mark, snapshot):
+    """Whether the snapshot's tally read already included the vote with this mark"""
+    pg_snapshot = snapshot.get('pg_snapshot')
+    if pg_snapshot is None:
+        return mark <= snapshot['built_at']
+    xmin, xmax, in_progress = pg_snapshot
+    # Visibility rule for a committed transaction
+    return mark < xmin or (mark < xmax and mark not in in_progress)
+
+def build_snapshot(version):
+    """Compute a fresh snapshot from the tally tables"""
+    built_at = time.time()
+    tally, pg_snapshot = _read_tally()
+
+    positions = {}
+    for position in position_registry.positions():
+        positions[position.id] = {
+            'name': position.name,
+            'slug': position.slug,
+            'total_votes': tally['positions'].get(position.id, 0),
+            'candidates': {},
+        }
+
+    candidates = ElectionCandidate.objects.filter(
+        position_id__in=positions, is_active=True
+    ).values_list('id', 'name', 'position_id')
+    for candidate_id, name, position_id in candidates:
+        positions[position_id]['candidates'][candidate_id] = {
+            'name': name,
+            'votes': tally['candidates'].get(candidate_id, 0),
+        }
+
+    for position in positions.values():
+        _update_percentages(position)
+
+    return {
+        'version': version,
+        'built_at': built_at,
+        'pg_snapshot': pg_snapshot,
+        'total_voters': get_user_model().objects.filter(is_active=True).count(),
+        'total_votes_cast': sum(tally['positions'].values()),
+        'positions': positions,
+    }
+
+def get_snapshot():
+    """Current snapshot, rebuilt when missing or older than RESULTS_SNAPSHOT_MAX_AGE_SECONDS"""
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+    if snapshot is not None and time.time() - snapshot['built_at'] < settings.RESULTS_SNAPSHOT_MAX_AGE_SECONDS:
+        return snapshot
+
+    if not cache.add(LOCK_CACHE_KEY, True, 10):
+        # Another worker is updating it; serve what we have if anything
+        if snapshot is not None:
+            return snapshot
+        return build_snapshot(get_version() or 0)
+
+    try:
+        snapshot = build_snapshot(_next_version())
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot, None)
+        return snapshot
+    finally:
+        cache.delete(LOCK_CACHE_KEY)
+
+def get_version():
+    return cache.get(VERSION_CACHE_KEY)
+
+def invalidate():
+    """Drop the snapshot so the next read rebuilds it from the database"""
+    cache.delete(SNAPSHOT_CACHE_KEY)
+    # Moves the version so no worker keeps serving its rendered copy
+    _next_version()
+
+@receiver(post_save, sender=ElectionPosition)
+@receiver(post_delete, sender=ElectionPosition)
+def _position_changed(sender, **kwargs):
+    transaction.on_commit(invalidate)
+
+def render(snapshot):
+    """Snapshot in the elections/live-stats/ response format"""
+    results = {
+        'total_voters': snapshot['total_voters'],
+        'total_votes_cast': snapshot['total_votes_cast'],
+    }
+    results.update(position_registry.empty_response(lambda: {'total_votes': 0, 'candidates': []}))
+
+    for position in snapshot['positions'].values():
+        results[position_registry.response_key(position['slug'])] = {
+            'total_votes': position['total_votes'],
+            'candidates': sorted(
+                ({'name': c['name'], 'votes': c['votes'], 'percentage': c['percentage']}
+                 for c in position['candidates'].values()),
+                key=lambda candidate: candidate['votes'],
+                reverse=True
+            ),
+        }
+    return results
+
+def get_rendered_results():
+    """
+    (version, rendered results). Served from this worker's memory while the shared
+    version hasn't moved, so an unchanged snapshot is never unpickled again.
+    """
+    global _rendered
+    version = get_version()
+    if version is not None and _rendered[0] == version:
+        snapshot_age = time.time() - _rendered[1]['built_at']
+        if snapshot_age < settings.RESULTS_SNAPSHOT_MAX_AGE_SECONDS:
+            return version, _rendered[1]['results']
+
+    snapshot = get_snapshot()
+    _rendered = (snapshot['version'], {'built_at': snapshot['built_at'], 'results': render(snapshot)})
+    return snapshot['version'], _rendered[1]['results']
+
+# ========== INCREMENTAL UPDATES ==========
+
+def record_votes(votes, transaction_id=None):
+    """
+    Queue committed votes as snapshot deltas. Call inside the vote transaction;
+    nothing is applied if it rolls back.
+    Each delta is marked so a snapshot that already counts it is left alone: with
+    the id of the inserting transaction on PostgreSQL (returned by the INSERT, see
+    AnonymousElectionVote.insert_if_absent), else with the commit time.
+    """
+    deltas = [(vote.position_id, vote.candidate_id) for vote in votes]
+    if deltas:
+        transaction.on_commit(
+            lambda: _add_pending([
+                (position_id, candidate_id, time.time() if transaction_id is None else transaction_id)
+                for position_id, candidate_id in deltas
+            ])
+        )
+
+def _add_pending(deltas):
+    global _flush_timer
+    with _pending_lock:
+        _pending.extend(deltas)
+
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(settings.RESULTS_SNAPSHOT_DEBOUNCE_SECONDS, flush)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+
+def flush():
+    """Apply this worker's pending deltas to the shared snapshot and bump its version"""
+    global _pending, _flush_timer
+    with _pending_lock:
+        pending, _pending = _pending, []
+        _flush_timer = None
+
+    if not pending:
+        return
+
+    if not cache.add(LOCK_CACHE_KEY, True, 10):
+        # Try again on the next tick rather than block the worker
+        _add_pending(pending)
+        return
+
+    try:
+        snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+        if snapshot is None:
+            # The next read rebuilds it from the database, which includes these votes
+            return
+
+        applied = [delta for delta in pending if not _counted(delta[2], snapshot)]
+        if not applied:
+            return
+
+        for position_id, candidate_id, _ in applied:
+            snapshot['total_votes_cast'] += 1
+            position = snapshot['positions'].get(position_id)
+            if position is None:
+                continue
+            candidate = position['candidates'].get(candidate_id)
+            if candidate is None:
+                # A candidate the snapshot doesn't know yet; rebuild on the next read
+                cache.delete(SNAPSHOT_CACHE_KEY)
+                return
+            candidate['votes'] += 1
+            position['total_votes'] += 1
+
+        for position_id in {position_id for position_id, _, _ in applied}:
+            if position_id in snapshot['positions']:
+                _update_percentages(snapshot['positions'][position_id])
+
+        snapshot['version'] = _next_version()
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot, None)
+    finally:
+        cache.delete(LOCK_CACHE_KEY)
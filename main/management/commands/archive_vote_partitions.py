@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from main import vote_partitions
+from main.models import VotingSession, StagedElectionVote
+
+class Command(BaseCommand):
+    help = (
+        'Detach the votes partitions of finished voting sessions and move them to the '
+        f'"{vote_partitions.ARCHIVE_SCHEMA}" schema (PostgreSQL only)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', type=int, action='append', dest='sessions', help='Session id to archive (repeatable)')
+        parser.add_argument(
+            '--ended-days-ago',
+            type=int,
+            help='Archive every inactive session whose voting_end_time is at least this many days old',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only list the partitions that would be archived')
+
+    def handle(self, *args, **options):
+        if not vote_partitions.is_partitioned():
+            raise CommandError('The votes table is not partitioned; this requires PostgreSQL with migration 0013 applied')
+
+        sessions = VotingSession.objects.filter(votes_archived_at__isnull=True)
+        if options['sessions']:
+            sessions = sessions.filter(id__in=options['sessions'])
+        elif options['ended_days_ago'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['ended_days_ago'])
+            sessions = sessions.filter(is_active=False, voting_end_time__lte=cutoff)
+        else:
+            raise CommandError('Pass --session or --ended-days-ago')
+
+        attached = vote_partitions.attached_session_ids()
+        archived = 0
+        for session in sessions.order_by('id'):
+            if session.is_active:
+                self.stdout.write(self.style.WARNING(f'Skipping {session.name}: the session is still active'))
+                continue
+            if session.id not in attached:
+                self.stdout.write(self.style.WARNING(f'Skipping {session.name}: no attached votes partition'))
+                continue
+
+            if options['dry_run']:
+                self.stdout.write(f'Would archive {vote_partitions.partition_name(session.id)} ({session.name})')
+                continue
+
+            with transaction.atomic():
+                table = vote_partitions.archive_partition(session.id)
+                # Drained staging rows only existed for duplicate detection during the vote
+                StagedElectionVote.objects.filter(session=session, is_drained=True).delete()
+                session.votes_archived_at = timezone.now()
+                session.save(update_fields=['votes_archived_at'])
+
+            archived += 1
+            self.stdout.write(f'Archived votes of {session.name} to {table}')
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} partition(s)'))
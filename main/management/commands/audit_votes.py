@@ -0,0 +1,105 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from main.models import AnonymousElectionVote, ElectionCandidate, ElectionCandidateTally
+
+def verify_chunk(rows):
+    """Recompute signatures for a chunk of votes; returns (mismatched vote ids, votes per candidate)"""
+    mismatched = []
+    counts = Counter()
+    for vote_id, voter_hash, candidate_id, vote_signature, voted_at in rows:
+        expected = AnonymousElectionVote.create_vote_signature(voter_hash, candidate_id, voted_at.isoformat())
+        if expected != vote_signature:
+            mismatched.append(vote_id)
+        counts[candidate_id] += 1
+    return mismatched, counts
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+class Command(BaseCommand):
+    help = (
+        'Verify every anonymous vote signature in parallel and compare the counted '
+        'votes with the candidate counters'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Signature checking processes')
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Votes per database fetch and per task')
+        parser.add_argument('--show', type=int, default=20, help='Mismatched vote ids to list')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        chunk_size = options['chunk_size']
+
+        rows = AnonymousElectionVote.objects.order_by('id').values_list(
+            'id', 'voter_hash', 'candidate_id', 'vote_signature', 'voted_at'
+        ).iterator(chunk_size=chunk_size)
+
+        mismatched = []
+        counts = Counter()
+        total = 0
+
+        def collect(futures):
+            nonlocal total
+            for future in futures:
+                chunk_mismatched, chunk_counts = future.result()
+                mismatched.extend(chunk_mismatched)
+                counts.update(chunk_counts)
+                total += sum(chunk_counts.values())
+
+        # Workers set Django up themselves so this also works where processes are spawned
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as executor:
+            pending = set()
+            for chunk in chunked(rows, chunk_size):
+                # Bound the chunks in flight so memory stays flat however large the table is
+                if len(pending) >= options['workers'] * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(verify_chunk, chunk))
+            collect(pending)
+
+        elapsed = time.monotonic() - started
+
+        live_counts = ElectionCandidateTally.merged_view(use_cache=False)['candidates']
+        drifted = []
+        # Past elections' candidates are inactive and their votes may be archived
+        active_candidates = ElectionCandidate.objects.filter(is_active=True).select_related('position')
+        for candidate in active_candidates.order_by('position_id', 'id'):
+            counted = counts.get(candidate.id, 0)
+            live = live_counts.get(candidate.id, candidate.vote_count)
+            if counted != live:
+                drifted.append((candidate, live, counted))
+
+        self.stdout.write(f'Audited {total} vote(s) in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.0f} votes/s)')
+
+        if mismatched:
+            mismatched.sort()
+            self.stdout.write(self.style.ERROR(f'{len(mismatched)} vote(s) with an invalid signature'))
+            for vote_id in mismatched[:options['show']]:
+                self.stdout.write(f'  vote {vote_id}')
+        else:
+            self.stdout.write(self.style.SUCCESS('All vote signatures are valid'))
+
+        if drifted:
+            self.stdout.write(self.style.ERROR(f'{len(drifted)} candidate counter(s) drifted from the votes table'))
+            for candidate, live, counted in drifted:
+                self.stdout.write(f'  {candidate}: counter {live}, votes {counted}')
+        else:
+            self.stdout.write(self.style.SUCCESS('All candidate counters match the votes table'))
+
+        # Fail so cron jobs and CI notice; the details are listed above
+        if mismatched or drifted:
+            raise CommandError(
+                f'Audit failed: {len(mismatched)} invalid signature(s), {len(drifted)} drifted counter(s)'
+            )
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from main import live_results, vote_log
+from main.models import StagedElectionVote
+
+class Command(BaseCommand):
+    help = 'Move staged votes into AnonymousElectionVote in batches (queued ingestion mode)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Staged votes per transaction')
+        parser.add_argument('--loop', action='store_true', help='Keep draining until interrupted')
+        parser.add_argument('--interval', type=float, default=0.5, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            drained = StagedElectionVote.drain(batch_size)
+            total += drained
+
+            if drained:
+                self.stdout.write(f'Drained {drained} staged vote(s)')
+                # Publish the drained batch in the vote log straight away
+                vote_log.append_all_pending_votes()
+                if drained == batch_size:
+                    continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        # Don't leave debounced result deltas behind when the process exits
+        live_results.flush()
+        self.stdout.write(self.style.SUCCESS(f'Drained {total} staged vote(s) in total'))
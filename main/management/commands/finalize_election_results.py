@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from main import final_results
+
+class Command(BaseCommand):
+    help = (
+        'Freeze the results of SU election sessions whose voting_end_time has passed, '
+        'draining ballots still in the ingestion queue first'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only list the sessions that would be finalized',
+        )
+        parser.add_argument('--loop', action='store_true', help='Keep finalizing sessions as they end until interrupted')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds between checks with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            for session in final_results.ended_sessions():
+                if options['dry_run']:
+                    self.stdout.write(self.style.WARNING(f'Dry run: {session.name} would be finalized'))
+                elif final_results.finalize(session):
+                    self.stdout.write(self.style.SUCCESS(f'Finalized results of {session.name}'))
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
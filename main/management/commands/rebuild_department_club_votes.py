@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from main.models import DepartmentClub
+
+class Command(BaseCommand):
+    help = 'Rebuild DepartmentClub.vote_count of every department and club from its votes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted items without writing them',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = DepartmentClub.rebuild_vote_counts()
+
+            for item, old_count, new_count in drifted:
+                self.stdout.write(f'{item}: {old_count} -> {new_count} vote(s)')
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING(f'Dry run: {len(drifted)} item(s) would be corrected'))
+                return
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt department/club vote counts ({len(drifted)} corrected)'))
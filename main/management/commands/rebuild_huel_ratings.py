@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from main.models import Huel
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the running rating sums, counts and averages of every huel from '
+        'the individual HuelRating rows.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted huels without writing them',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = Huel.rebuild_ratings()
+
+            for huel, old_count, new_count in drifted:
+                self.stdout.write(f'{huel}: {old_count} -> {new_count} rating(s)')
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING(f'Dry run: {len(drifted)} huel(s) would be corrected'))
+                return
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt huel ratings ({len(drifted)} corrected)'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from main import live_results
+from main.models import ElectionCandidate
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild ElectionCandidate.vote_count from the anonymous votes table and fold '
+        'the striped tallies into it. Ballots cast meanwhile wait for it to finish.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report drifted counters without writing them',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            drifted = ElectionCandidate.reconcile_vote_counts()
+
+            for candidate, old_count, new_count in drifted:
+                self.stdout.write(f'{candidate}: {old_count} -> {new_count}')
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING(f'Dry run: {len(drifted)} counter(s) would be corrected'))
+                return
+
+        live_results.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled vote counts ({len(drifted)} corrected)'))
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from main import vote_log
+
+class Command(BaseCommand):
+    help = 'Append new anonymous votes to the Merkle vote log and publish the new root'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Votes appended per checkpoint')
+        parser.add_argument('--loop', action='store_true', help='Keep appending until interrupted')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to wait when there is nothing to append')
+
+    def handle(self, *args, **options):
+        while True:
+            checkpoint = vote_log.append_all_pending_votes(options['batch_size'])
+            if checkpoint is not None:
+                self.stdout.write(f'Vote log at {checkpoint.tree_size} vote(s), root {checkpoint.root_hash}')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        checkpoint = vote_log.latest_checkpoint()
+        if checkpoint is None:
+            self.stdout.write(self.style.SUCCESS('Vote log is empty'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Vote log root at {checkpoint.tree_size} vote(s): {checkpoint.root_hash}'
+            ))
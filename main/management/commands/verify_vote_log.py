@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from main import vote_log
+from main.models import AnonymousElectionVote, VotingSession, VoteLogNode
+
+class Command(BaseCommand):
+    help = 'Recompute the Merkle vote log root from the stored votes and compare it with the published root'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000, help='Votes fetched per database round trip')
+
+    def handle(self, *args, **options):
+        checkpoint = vote_log.latest_checkpoint()
+        if checkpoint is None:
+            self.stdout.write('Vote log is empty, nothing to verify')
+            return
+
+        tree = vote_log.StreamingTreeHash()
+        has_archived_votes = VotingSession.objects.filter(votes_archived_at__isnull=False).exists()
+        stored_leaves = 0
+
+        def add_stored_leaves(end):
+            """Leaves of archived votes come from the stored log instead of the votes table"""
+            nonlocal stored_leaves
+            leaves = VoteLogNode.objects.filter(
+                level=0, node_index__gte=tree.size, node_index__lt=end
+            ).order_by('node_index').values_list('node_index', 'hash')
+            for node_index, value in leaves.iterator(chunk_size=options['chunk_size']):
+                if node_index != tree.size:
+                    break
+                tree.add(value)
+                stored_leaves += 1
+
+        votes = AnonymousElectionVote.objects.filter(
+            log_index__isnull=False, log_index__lt=checkpoint.tree_size
+        ).order_by('log_index').values_list(
+            'log_index', 'voter_hash', 'candidate_id', 'position_id', 'vote_signature'
+        )
+
+        for log_index, voter_hash, candidate_id, position_id, vote_signature in votes.iterator(
+            chunk_size=options['chunk_size']
+        ):
+            if log_index > tree.size and has_archived_votes:
+                add_stored_leaves(log_index)
+            if log_index != tree.size:
+                raise CommandError(f'Vote log has a gap or duplicate at index {tree.size}')
+            tree.add(vote_log.leaf_hash(vote_log.leaf_data(voter_hash, candidate_id, position_id, vote_signature)))
+
+        if tree.size < checkpoint.tree_size and has_archived_votes:
+            add_stored_leaves(checkpoint.tree_size)
+
+        if tree.size != checkpoint.tree_size:
+            raise CommandError(
+                f'Published root covers {checkpoint.tree_size} vote(s) but only {tree.size} are logged'
+            )
+
+        root = tree.root()
+        if root != checkpoint.root_hash:
+            raise CommandError(
+                f'Root mismatch at {tree.size} vote(s): computed {root}, published {checkpoint.root_hash}'
+            )
+
+        if stored_leaves:
+            self.stdout.write(f'{stored_leaves} leaf hash(es) of archived votes were taken from the stored log')
+        self.stdout.write(self.style.SUCCESS(f'Vote log verified: {tree.size} vote(s), root {root}'))
@@ -0,0 +1,93 @@
+import math
+import time
+
+from django.conf import settings
+from django.http import JsonResponse
+
+# ========== ADMISSION CONTROL ==========
+
+# Requests that are never shed: voting, logging in and the admin
+HIGH_PRIORITY_PATHS = (
+    '/api/main/elections/cast-',
+    '/api/main/gensec_vote/',
+    '/api/main/prez_vote/',
+    '/api/main/auth/',
+    '/api/token/',
+    '/api/hitler/',
+)
+
+# Requests shed first: nice-to-have pages that can wait
+LOW_PRIORITY_PATHS = (
+    '/api/main/contributions/',
+    '/api/main/stats/',
+)
+LOW_PRIORITY_READ_PATHS = (
+    '/api/superchat/',
+)
+
+# Long-lived connections served by the stream service, never shed
+EXEMPT_PATHS = (
+    '/api/main/elections/live-stream/',
+    '/api/main/voting/long-poll/',
+)
+
+def request_priority(request):
+    path = request.path
+    if path.startswith(HIGH_PRIORITY_PATHS):
+        return 'high'
+    if path.startswith(LOW_PRIORITY_PATHS):
+        return 'low'
+    if request.method == 'GET' and path.startswith(LOW_PRIORITY_READ_PATHS):
+        return 'low'
+    return 'normal'
+
+def queue_wait(request):
+    """
+    Seconds the request waited before this worker picked it up, from the
+    X-Request-Start: t=<epoch seconds> header set by nginx (0 without it).
+    """
+    header = request.headers.get('X-Request-Start', '')
+    try:
+        started = float(header[2:] if header.startswith('t=') else header)
+    except ValueError:
+        return 0
+    if started > 1e11:  # Milliseconds or microseconds since the epoch
+        started /= 1000 if started < 1e14 else 1000000
+    return max(0, time.time() - started)
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds low-priority requests with 503 and Retry-After while the workers are
+    overloaded, so voting stays responsive when traffic spikes.
+    The signal is how long the request queued in front of gunicorn before a
+    worker picked it up: with sync workers each one serves a single request at a
+    time, so a backlog shows up there and not in any per-worker count. Low-priority
+    requests are refused once it exceeds ADMISSION_LOW_PRIORITY_MAX_DELAY_SECONDS,
+    normal ones past ADMISSION_NORMAL_PRIORITY_MAX_DELAY_SECONDS; votes and logins
+    always go through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def shed(self, delay):
+        response = JsonResponse({"error": "The server is busy, please try again shortly"}, status=503)
+        response['Retry-After'] = str(max(1, math.ceil(delay)))
+        return response
+
+    def __call__(self, request):
+        if not settings.ADMISSION_CONTROL_ENABLED or request.path.startswith(EXEMPT_PATHS):
+            return self.get_response(request)
+
+        priority = request_priority(request)
+        if priority != 'high':
+            delay = queue_wait(request)
+            limit = (
+                settings.ADMISSION_LOW_PRIORITY_MAX_DELAY_SECONDS if priority == 'low'
+                else settings.ADMISSION_NORMAL_PRIORITY_MAX_DELAY_SECONDS
+            )
+            if delay > limit:
+                return self.shed(delay)
+
+        return self.get_response(request)
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0008_votingsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ElectionCandidateTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stripe', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='main.electioncandidate')),
+            ],
+            options={
+                'unique_together': {('candidate', 'stripe')},
+            },
+        ),
+    ]
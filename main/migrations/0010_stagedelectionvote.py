@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0009_electioncandidatetally'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StagedElectionVote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('voter_hash', models.CharField(max_length=64)),
+                ('vote_signature', models.CharField(max_length=128)),
+                ('voted_at', models.DateTimeField()),
+                ('ip_hash', models.CharField(blank=True, max_length=64)),
+                ('is_drained', models.BooleanField(db_default=False)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staged_votes', to='main.electioncandidate')),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='staged_votes', to='main.electionposition')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['is_drained', 'id'], name='main_staged_is_drai_015284_idx')],
+                'unique_together': {('voter_hash', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0010_stagedelectionvote'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteLogCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tree_size', models.BigIntegerField(unique=True)),
+                ('root_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VoteLogNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField()),
+                ('node_index', models.BigIntegerField()),
+                ('hash', models.CharField(max_length=64)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='anonymouselectionvote',
+            name='log_index',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='anonymouselectionvote',
+            name='vote_signature',
+            field=models.CharField(db_index=True, max_length=128),
+        ),
+        migrations.AddIndex(
+            model_name='anonymouselectionvote',
+            index=models.Index(fields=['log_index'], name='main_anonym_log_ind_e4d6e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='anonymouselectionvote',
+            index=models.Index(condition=models.Q(('log_index__isnull', True)), fields=['id'], name='vote_unlogged_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='votelognode',
+            unique_together={('level', 'node_index')},
+        ),
+    ]
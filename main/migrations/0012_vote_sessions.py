@@ -0,0 +1,59 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_election_session(apps, schema_editor):
+    """Attach existing ballots to the SU election session, creating one if none is configured"""
+    VotingSession = apps.get_model('main', 'VotingSession')
+    AnonymousElectionVote = apps.get_model('main', 'AnonymousElectionVote')
+    StagedElectionVote = apps.get_model('main', 'StagedElectionVote')
+
+    unassigned_votes = AnonymousElectionVote.objects.filter(session__isnull=True)
+    unassigned_staged = StagedElectionVote.objects.filter(session__isnull=True)
+    if not unassigned_votes.exists() and not unassigned_staged.exists():
+        return
+
+    session = VotingSession.objects.filter(voting_type='su_election').order_by('-is_active', '-created_at').first()
+    if session is None:
+        session = VotingSession.objects.create(name='SU Election', voting_type='su_election', is_active=True)
+
+    unassigned_votes.update(session=session)
+    unassigned_staged.update(session=session)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0011_vote_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='votingsession',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='anonymouselectionvote',
+            name='session',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='election_votes', to='main.votingsession'),
+        ),
+        migrations.AddField(
+            model_name='stagedelectionvote',
+            name='session',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='staged_votes', to='main.votingsession'),
+        ),
+        migrations.AddField(
+            model_name='votingsession',
+            name='votes_archived_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='votingsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('voting_type',), name='one_active_session_per_voting_type', violation_error_message='Another session of this voting type is already active.'),
+        ),
+        migrations.RunPython(assign_election_session, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,154 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+TABLE = 'main_anonymouselectionvote'
+OLD_TABLE = 'main_anonymouselectionvote_unpartitioned'
+SEQUENCE = 'main_anonymouselectionvote_id_seq'
+NEW_SEQUENCE = 'main_anonymouselectionvote_id_partitioned_seq'
+
+
+def _move_aside(cursor):
+    """
+    Rename the votes table to OLD_TABLE and drop its constraints and indexes, whose
+    names are unique per schema. Returns their definitions for the new table.
+    """
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = %s",
+        [TABLE]
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f', 'c')",
+        [TABLE]
+    )
+    constraints = cursor.fetchall()
+    constraint_names = {name for name, _, _ in constraints}
+    indexes = [(name, definition) for name, definition in indexes if name not in constraint_names]
+
+    cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}')
+    for name, _, _ in constraints:
+        cursor.execute(f'ALTER TABLE {OLD_TABLE} DROP CONSTRAINT "{name}"')
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    return constraints, indexes
+
+
+def _recreate(cursor, constraints, indexes, primary_key):
+    """
+    Add the captured constraints and indexes to the new votes table. Done after
+    copying the rows: that validates each one in a single pass, and no deferred
+    foreign key checks are left pending to block later ALTER TABLEs.
+    """
+    for name, constraint_type, definition in constraints:
+        if constraint_type == 'p':
+            definition = primary_key
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT "{name}" {definition}')
+    for _, definition in indexes:
+        # Indexes of a partitioned table are reported as "ON ONLY <table>"
+        cursor.execute(definition.replace(' ON ONLY ', ' ON ', 1))
+
+
+def partition_votes_table(apps, schema_editor):
+    """
+    Rebuild the votes table as a PostgreSQL table partitioned by LIST (session_id),
+    with one partition per existing session and a DEFAULT partition.
+    This copies every vote under an exclusive lock, so run it while voting is closed.
+
+    The primary key becomes (id, session_id) because a partitioned table's unique
+    constraints must contain the partition key. Django's state keeps id as the
+    primary key: ids stay unique because they all come from one sequence (an
+    owned sequence, since identity columns need PostgreSQL 17 on partitioned
+    tables) and nothing inserts explicit ids, and no foreign key references
+    this table.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    VotingSession = apps.get_model('main', 'VotingSession')
+
+    with schema_editor.connection.cursor() as cursor:
+        constraints, indexes = _move_aside(cursor)
+
+        cursor.execute(f'CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS) PARTITION BY LIST (session_id)')
+        cursor.execute(f'CREATE SEQUENCE {NEW_SEQUENCE} OWNED BY {TABLE}.id')
+        cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{NEW_SEQUENCE}')")
+
+        for session_id in VotingSession.objects.values_list('id', flat=True):
+            cursor.execute(f'CREATE TABLE {TABLE}_s{session_id} PARTITION OF {TABLE} FOR VALUES IN ({session_id})')
+        cursor.execute(f'CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT')
+
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}')
+        cursor.execute(f"SELECT setval('{NEW_SEQUENCE}', COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)")
+        _recreate(cursor, constraints, indexes, 'PRIMARY KEY (id, session_id)')
+
+        # Dropping the old table also drops its identity sequence, freeing the usual name
+        cursor.execute(f'DROP TABLE {OLD_TABLE}')
+        cursor.execute(f'ALTER SEQUENCE {NEW_SEQUENCE} RENAME TO {SEQUENCE}')
+
+
+def unpartition_votes_table(apps, schema_editor):
+    """
+    Copy the votes back into a plain table with an identity id primary key.
+    Partitions detached by archive_vote_partitions are no longer part of the
+    table and stay in the archive schema.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        constraints, indexes = _move_aside(cursor)
+        # Free the usual name for the identity sequence; the old table's sequence goes with it
+        cursor.execute(f'ALTER SEQUENCE {SEQUENCE} RENAME TO {NEW_SEQUENCE}')
+
+        cursor.execute(f'CREATE TABLE {TABLE} (LIKE {OLD_TABLE} INCLUDING DEFAULTS)')
+        cursor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN id DROP DEFAULT')
+        cursor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {OLD_TABLE}')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {TABLE}), 0) + 1, false)"
+        )
+        _recreate(cursor, constraints, indexes, 'PRIMARY KEY (id)')
+        cursor.execute(f'DROP TABLE {OLD_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0012_vote_sessions'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='anonymouselectionvote',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='stagedelectionvote',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='anonymouselectionvote',
+            name='session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='election_votes', to='main.votingsession'),
+        ),
+        migrations.AlterField(
+            model_name='stagedelectionvote',
+            name='session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='staged_votes', to='main.votingsession'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='anonymouselectionvote',
+            unique_together={('voter_hash', 'position', 'session')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='stagedelectionvote',
+            unique_together={('voter_hash', 'position', 'session')},
+        ),
+        migrations.RunPython(partition_votes_table, unpartition_votes_table),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0013_partition_votes_by_session'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='votingsession',
+            name='results_finalized_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='FinalElectionResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position_name', models.CharField(max_length=100)),
+                ('candidate_name', models.CharField(max_length=100)),
+                ('votes', models.IntegerField()),
+                ('position_total_votes', models.IntegerField()),
+                ('percentage', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='final_results', to='main.electioncandidate')),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='final_results', to='main.electionposition')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='final_results', to='main.votingsession')),
+            ],
+            options={
+                'ordering': ['session', 'position', 'rank'],
+                'unique_together': {('session', 'candidate')},
+            },
+        ),
+    ]
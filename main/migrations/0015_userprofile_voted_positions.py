@@ -0,0 +1,65 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:45
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def voter_hash(user_id, position_id):
+    """AnonymousElectionVote.create_voter_hash as of this migration"""
+    data = f"{user_id}:{position_id}:pollz_anonymous_voting_salt_2024"
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def backfill_voted_positions(apps, schema_editor):
+    """Record the positions each user already voted for in the current SU election"""
+    VotingSession = apps.get_model('main', 'VotingSession')
+    ElectionPosition = apps.get_model('main', 'ElectionPosition')
+    AnonymousElectionVote = apps.get_model('main', 'AnonymousElectionVote')
+    StagedElectionVote = apps.get_model('main', 'StagedElectionVote')
+    UserProfile = apps.get_model('main', 'UserProfile')
+
+    session = VotingSession.objects.filter(voting_type='su_election').order_by('-is_active', '-created_at').first()
+    if session is None:
+        return
+
+    # Voter hashes are one-way, so hash every (user, position) pair and look them up
+    cast = set(AnonymousElectionVote.objects.filter(session=session).values_list('voter_hash', flat=True))
+    cast.update(StagedElectionVote.objects.filter(session=session).values_list('voter_hash', flat=True))
+    if not cast:
+        return
+
+    position_ids = list(ElectionPosition.objects.values_list('id', flat=True))
+    profiles = []
+    for profile in UserProfile.objects.only('id', 'user_id').iterator(chunk_size=2000):
+        voted = [
+            position_id for position_id in position_ids
+            if voter_hash(profile.user_id, position_id) in cast
+        ]
+        if voted:
+            profile.voted_session = session
+            profile.voted_positions = voted
+            profiles.append(profile)
+    UserProfile.objects.bulk_update(profiles, ['voted_session', 'voted_positions'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0014_finalelectionresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='voted_positions',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='voted_session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='main.votingsession'),
+        ),
+        migrations.RunPython(backfill_voted_positions, migrations.RunPython.noop),
+    ]
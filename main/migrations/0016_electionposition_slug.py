@@ -0,0 +1,38 @@
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def populate_slugs(apps, schema_editor):
+    ElectionPosition = apps.get_model('main', 'ElectionPosition')
+    taken = set()
+    for position in ElectionPosition.objects.order_by('id'):
+        slug = slugify(position.name) or f'position-{position.id}'
+        if slug in taken:
+            slug = f'{slug}-{position.id}'
+        taken.add(slug)
+        position.slug = slug
+        position.save(update_fields=['slug'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0015_userprofile_voted_positions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='electionposition',
+            name='slug',
+            # Without an index until the slugs are filled in; on PostgreSQL the
+            # unique AlterField below would otherwise create its _like index twice
+            field=models.SlugField(db_index=False, default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='electionposition',
+            name='slug',
+            field=models.SlugField(max_length=100, unique=True),
+        ),
+    ]
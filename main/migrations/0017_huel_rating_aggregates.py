@@ -0,0 +1,52 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:51
+
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+def combine_averages(avg_grading, avg_toughness, avg_overall):
+    """Huel.combine_averages as of this migration"""
+    if avg_grading and avg_toughness and avg_overall:
+        return (avg_grading + avg_toughness + avg_overall) / 3
+    return avg_overall or 0.0
+
+
+def backfill_aggregates(apps, schema_editor):
+    """Compute rating_count and combined_score, and refresh the averages, of every huel"""
+    Huel = apps.get_model('main', 'Huel')
+    huels = list(Huel.objects.annotate(
+        count=Count('ratings'),
+        grading=Avg('ratings__grading'),
+        toughness=Avg('ratings__toughness'),
+        overall=Avg('ratings__overall'),
+    ))
+    for huel in huels:
+        huel.rating_count = huel.count
+        huel.avg_grading = huel.grading or 0
+        huel.avg_toughness = huel.toughness or 0
+        huel.avg_overall = huel.overall or 0
+        huel.combined_score = combine_averages(huel.avg_grading, huel.avg_toughness, huel.avg_overall)
+    Huel.objects.bulk_update(
+        huels, ['rating_count', 'avg_grading', 'avg_toughness', 'avg_overall', 'combined_score'], batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0016_electionposition_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='huel',
+            name='combined_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='huel',
+            name='rating_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:52
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_sums(apps, schema_editor):
+    Huel = apps.get_model('main', 'Huel')
+    huels = list(Huel.objects.annotate(
+        grading=Sum('ratings__grading'),
+        toughness=Sum('ratings__toughness'),
+        overall=Sum('ratings__overall'),
+    ))
+    for huel in huels:
+        huel.sum_grading = huel.grading or 0
+        huel.sum_toughness = huel.toughness or 0
+        huel.sum_overall = huel.overall or 0
+    Huel.objects.bulk_update(huels, ['sum_grading', 'sum_toughness', 'sum_overall'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0017_huel_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='huel',
+            name='sum_grading',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='huel',
+            name='sum_overall',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='huel',
+            name='sum_toughness',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(backfill_sums, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.1.1 on 2026-10-17 23:05
+
+import re
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+# Expressions must stay identical to the ones main.huel_search queries with
+INDEXES = {
+    'huel_search_document_idx':
+        "USING gin (to_tsvector('simple', code || ' ' || name || ' ' || instructor))",
+    'huel_search_key_trgm_idx':
+        "USING gin (search_key gin_trgm_ops)",
+    'huel_search_text_trgm_idx':
+        "USING gin (lower(name || ' ' || instructor) gin_trgm_ops)",
+}
+
+
+class PostgresTrigramExtension(TrigramExtension):
+    """TrigramExtension that is also a no-op when unapplied on other databases"""
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def build_search_key(code):
+    """Huel.build_search_key as of this migration"""
+    compact = re.sub(r'[\W_]+', '', code.lower())
+    keys = [compact]
+    match = re.match(r'([^\W\d_]+)\s+[^\W\d_](\d\w*)$', code.strip().lower())
+    if match and match.group(1) + match.group(2) != compact:
+        keys.append(match.group(1) + match.group(2))
+    return ' '.join(keys)
+
+
+def backfill_search_keys(apps, schema_editor):
+    Huel = apps.get_model('main', 'Huel')
+    huels = list(Huel.objects.only('code'))
+    for huel in huels:
+        huel.search_key = build_search_key(huel.code)
+    Huel.objects.bulk_update(huels, ['search_key'], batch_size=1000)
+
+
+def create_search_indexes(apps, schema_editor):
+    """Full-text and trigram GIN indexes; PostgreSQL only, other databases search without them"""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name, definition in INDEXES.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON main_huel {definition}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name in INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0018_huel_rating_sums'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='huel',
+            name='search_key',
+            field=models.CharField(blank=True, editable=False, max_length=50),
+        ),
+        migrations.RunPython(backfill_search_keys, migrations.RunPython.noop),
+        PostgresTrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.1 on 2026-10-17 23:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_vote_counts(apps, schema_editor):
+    """vote_count was not maintained before; set it to the actual number of votes"""
+    DepartmentClub = apps.get_model('main', 'DepartmentClub')
+    items = list(DepartmentClub.objects.annotate(actual_count=Count('votes')))
+    for item in items:
+        item.vote_count = item.actual_count
+    DepartmentClub.objects.bulk_update(items, ['vote_count'], batch_size=1000)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('main', '0019_huel_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_vote_counts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='departmentclub',
+            index=models.Index(fields=['vote_count', 'id'], name='deptclub_vote_count_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='departmentclub',
+            index=models.Index(fields=['type', 'size', 'vote_count', 'id'], name='deptclub_type_votes_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='huel',
+            index=models.Index(fields=['avg_overall', 'id'], name='huel_avg_overall_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='huel',
+            index=models.Index(fields=['avg_grading', 'id'], name='huel_avg_grading_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='huel',
+            index=models.Index(fields=['avg_toughness', 'id'], name='huel_avg_toughness_id_idx'),
+        ),
+    ]
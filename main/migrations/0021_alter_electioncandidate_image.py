@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 00:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """ElectionCandidate.image became an ImageField in the models without a migration"""
+
+    dependencies = [
+        ('main', '0020_catalogue_keyset_pagination'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='electioncandidate',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='candidates/'),
+        ),
+    ]
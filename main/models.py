@@ -1,7 +1,16 @@
-from django.db import models
+from django.db import models, connection, transaction
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.text import slugify
+from collections import Counter
 import hashlib
+import random
+import re
 import secrets
 
 # ========== ELECTION MODELS ==========
@@ -35,12 +44,52 @@ class VotingSession(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
 
+    # Set when the session's votes partition has been detached to the archive schema
+    votes_archived_at = models.DateTimeField(null=True, blank=True)
+    # Set once FinalElectionResult rows have been written for the session
+    results_finalized_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
-        unique_together = ['voting_type']  # One active session per voting type
+        constraints = [
+            # Past sessions are kept for their votes; only one per voting type can be active
+            models.UniqueConstraint(
+                fields=['voting_type'],
+                condition=models.Q(is_active=True),
+                name='one_active_session_per_voting_type',
+                violation_error_message='Another session of this voting type is already active.',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({'Active' if self.is_active else 'Inactive'})"
 
+    def save(self, *args, **kwargs):
+        created = self._state.adding
+        super().save(*args, **kwargs)
+        if created:
+            from . import vote_partitions
+            vote_partitions.ensure_partition(self.id)
+
+    @classmethod
+    def current(cls, voting_type):
+        """The active session of a voting type, else the most recently created one"""
+        return cls.objects.filter(voting_type=voting_type).order_by('-is_active', '-created_at').first()
+
+    @classmethod
+    def for_votes(cls, voting_type):
+        """
+        Session new votes of this type belong to. Votes have always been accepted
+        without a configured session, so one is created (active) the first time.
+        """
+        session = cls.current(voting_type)
+        if session is None:
+            session, _ = cls.objects.get_or_create(
+                voting_type=voting_type,
+                is_active=True,
+                defaults={'name': dict(cls.VOTING_TYPE_CHOICES)[voting_type]}
+            )
+        return session
+
     def get_current_status(self):
         """
         Returns current voting status and appropriate message
@@ -68,6 +117,7 @@ class VotingSession(models.Model):
 
 class ElectionPosition(models.Model):
     name = models.CharField(max_length=100, unique=True)  # President, General Secretary, etc.
+    slug = models.SlugField(max_length=100, unique=True)  # president, general-secretary, etc.
     description = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -75,6 +125,11 @@ class ElectionPosition(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = slugify(self.name)
+        super().save(*args, **kwargs)
+
 class ElectionCandidate(models.Model):
     name = models.CharField(max_length=100)
     position = models.ForeignKey(ElectionPosition, on_delete=models.CASCADE, related_name='candidates')
@@ -92,12 +147,172 @@ class ElectionCandidate(models.Model):
     def __str__(self):
         return f"{self.name} - {self.position.name}"
 
+    def get_live_vote_count(self):
+        """Folded vote_count plus the striped deltas recorded since the last reconcile"""
+        return ElectionCandidateTally.merged_view()['candidates'].get(self.id, self.vote_count)
+
     def get_vote_percentage(self):
-        total_votes = ElectionCandidate.objects.filter(position=self.position).aggregate(
-            total=models.Sum('vote_count'))['total'] or 0
+        tally = ElectionCandidateTally.merged_view()
+        total_votes = tally['positions'].get(self.position_id, 0)
         if total_votes == 0:
             return 0
-        return round((self.vote_count / total_votes) * 100, 1)
+        return round((tally['candidates'].get(self.id, 0) / total_votes) * 100, 1)
+
+    @classmethod
+    def reconcile_vote_counts(cls):
+        """
+        Rebuild vote_count for every active candidate from AnonymousElectionVote rows
+        and fold the striped tallies back into it. Inactive candidates belong to past
+        elections whose votes may have been archived, so they keep their live count.
+        Returns a list of (candidate, old_count, new_count) for the rows that drifted.
+        Votes can keep coming in: the stripes are locked against increments until
+        the surrounding transaction commits, so a ballot is either already counted
+        and folded or lands on the fresh stripes afterwards.
+        """
+        with transaction.atomic():
+            ElectionCandidateTally.lock()
+            actual_counts = dict(
+                AnonymousElectionVote.objects.values('candidate_id')
+                .annotate(total=models.Count('id'))
+                .values_list('candidate_id', 'total')
+            )
+            live_counts = ElectionCandidateTally.merged_view(use_cache=False)['candidates']
+
+            candidates = list(cls.objects.all())
+            drifted = []
+            for candidate in candidates:
+                live = live_counts.get(candidate.id, candidate.vote_count)
+                if not candidate.is_active:
+                    candidate.vote_count = live
+                    continue
+                actual = actual_counts.get(candidate.id, 0)
+                if live != actual:
+                    drifted.append((candidate, live, actual))
+                candidate.vote_count = actual
+
+            cls.objects.bulk_update(candidates, ['vote_count'])
+            ElectionCandidateTally.objects.all().delete()
+        ElectionCandidateTally.invalidate_merged_view()
+        return drifted
+
+
+class ElectionCandidateTally(models.Model):
+    """
+    Striped vote counter for a candidate.
+    Each ballot increments one randomly chosen stripe, so concurrent votes for a
+    popular candidate don't all queue on the same row lock. A candidate's live
+    count is its folded vote_count plus the sum of its stripes.
+    """
+    MERGED_VIEW_CACHE_KEY = 'election:tally:merged'
+
+    candidate = models.ForeignKey(ElectionCandidate, on_delete=models.CASCADE, related_name='tallies')
+    stripe = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['candidate', 'stripe']
+
+    def __str__(self):
+        return f"{self.candidate.name} stripe {self.stripe}: {self.count}"
+
+    @classmethod
+    def increment(cls, candidate_id, amount=1):
+        """Add to a random stripe of the candidate, creating the stripe on first use"""
+        stripe = random.randrange(settings.VOTE_TALLY_STRIPES)
+        stripe_rows = cls.objects.filter(candidate_id=candidate_id, stripe=stripe)
+        if not stripe_rows.update(count=models.F('count') + amount):
+            cls.objects.bulk_create(
+                [cls(candidate_id=candidate_id, stripe=stripe)], ignore_conflicts=True
+            )
+            stripe_rows.update(count=models.F('count') + amount)
+
+    @classmethod
+    def lock(cls):
+        """
+        Block stripe increments until the current transaction ends (PostgreSQL).
+        Waits for ballots that already incremented a stripe to commit, so they are
+        visible to the caller's reads.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(f'LOCK TABLE {cls._meta.db_table} IN EXCLUSIVE MODE')
+
+    @classmethod
+    def merged_view(cls, use_cache=True):
+        """
+        Live counts with stripes summed, from one grouped query.
+        Returns {'candidates': {candidate_id: votes}, 'positions': {position_id: votes}}
+        and is cached for VOTE_TALLY_CACHE_SECONDS so reads never touch the stripe rows.
+        """
+        if use_cache:
+            merged = cache.get(cls.MERGED_VIEW_CACHE_KEY)
+            if merged is not None:
+                return merged
+
+        merged = {'candidates': {}, 'positions': {}}
+        rows = ElectionCandidate.objects.values('id', 'position_id', 'vote_count').annotate(
+            striped=models.Sum('tallies__count')
+        )
+        for row in rows:
+            votes = row['vote_count'] + (row['striped'] or 0)
+            merged['candidates'][row['id']] = votes
+            merged['positions'][row['position_id']] = merged['positions'].get(row['position_id'], 0) + votes
+
+        cache.set(cls.MERGED_VIEW_CACHE_KEY, merged, settings.VOTE_TALLY_CACHE_SECONDS)
+        return merged
+
+    @classmethod
+    def invalidate_merged_view(cls):
+        cache.delete(cls.MERGED_VIEW_CACHE_KEY)
+
+
+def _insert_votes_if_absent(model, votes):
+    """
+    INSERT ... ON CONFLICT (voter_hash, position, session) DO NOTHING RETURNING for
+    any vote table, reporting which rows were actually written from the same statement.
+    Returns (written votes, id of the inserting transaction on PostgreSQL, else None).
+    """
+    if not votes:
+        return [], None
+
+    qn = connection.ops.quote_name
+    position_column = model._meta.get_field('position').column
+    session_column = model._meta.get_field('session').column
+    columns = [
+        model._meta.get_field(name).column
+        for name in ['voter_hash', 'candidate', 'position', 'session', 'vote_signature', 'voted_at', 'ip_hash']
+    ]
+    placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s, %s)'] * len(votes))
+    sql = (
+        f"INSERT INTO {qn(model._meta.db_table)} ({', '.join(qn(column) for column in columns)}) "
+        f"VALUES {placeholders} "
+        f"ON CONFLICT ({qn('voter_hash')}, {qn(position_column)}, {qn(session_column)}) DO NOTHING "
+        f"RETURNING {qn('id')}, {qn('voter_hash')}, {qn(position_column)}, {qn(session_column)}"
+    )
+    if connection.vendor == 'postgresql':
+        # Lets live_results tell which snapshots already count these votes, without another query
+        sql += ", pg_current_xact_id()::text"
+    params = []
+    for vote in votes:
+        params.extend([
+            vote.voter_hash, vote.candidate_id, vote.position_id, vote.session_id, vote.vote_signature,
+            connection.ops.adapt_datetimefield_value(vote.voted_at), vote.ip_hash,
+        ])
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    inserted_ids = {row[1:4]: row[0] for row in rows}
+    transaction_id = int(rows[0][4]) if rows and len(rows[0]) > 4 else None
+
+    inserted = []
+    for vote in votes:
+        pk = inserted_ids.get((vote.voter_hash, vote.position_id, vote.session_id))
+        if pk is not None:
+            vote.pk = pk
+            vote._state.adding = False
+            inserted.append(vote)
+    return inserted, transaction_id
 
 
 class AnonymousElectionVote(models.Model):
@@ -111,19 +326,26 @@ class AnonymousElectionVote(models.Model):
     # Vote details
     candidate = models.ForeignKey(ElectionCandidate, on_delete=models.CASCADE, related_name='anonymous_votes')
     position = models.ForeignKey(ElectionPosition, on_delete=models.CASCADE)
+    # Votes are stored in one PostgreSQL partition per session (see vote_partitions.py)
+    session = models.ForeignKey(VotingSession, on_delete=models.PROTECT, related_name='election_votes')
     
     # Cryptographic verification (without revealing identity)
-    vote_signature = models.CharField(max_length=128)  # Cryptographic signature for verification
+    vote_signature = models.CharField(max_length=128, db_index=True)  # Cryptographic signature for verification
     
     # Metadata
     voted_at = models.DateTimeField(auto_now_add=True)
     ip_hash = models.CharField(max_length=64, blank=True)  # Hashed IP for basic fraud prevention
+
+    # Leaf position in the Merkle vote log, set when the vote is appended to it
+    log_index = models.BigIntegerField(null=True, blank=True)
     
     class Meta:
-        unique_together = ['voter_hash', 'position']  # One vote per position per anonymous voter
+        unique_together = ['voter_hash', 'position', 'session']  # One vote per position per anonymous voter per election
         indexes = [
             models.Index(fields=['position', 'voted_at']),
             models.Index(fields=['candidate', 'voted_at']),
+            models.Index(fields=['log_index']),
+            models.Index(fields=['id'], condition=models.Q(log_index__isnull=True), name='vote_unlogged_idx'),
         ]
 
     @staticmethod
@@ -140,6 +362,17 @@ class AnonymousElectionVote(models.Model):
         data = f"{voter_hash}:{candidate_id}:{timestamp}"
         return hashlib.sha256(data.encode()).hexdigest()
     
+    @classmethod
+    def insert_if_absent(cls, votes):
+        """
+        Insert unsaved votes with one INSERT ... ON CONFLICT DO NOTHING statement.
+        The (voter_hash, position, session) unique constraint decides duplicates, so there is
+        no check-then-insert race and no extra lookup. Sets pk on the votes that were
+        written and returns them, leaving out votes that hit the constraint, along with
+        the transaction id live_results.record_votes() takes.
+        """
+        return _insert_votes_if_absent(cls, votes)
+
     @staticmethod
     def hash_ip(ip_address):
         """Hash IP address for basic fraud prevention without storing actual IP"""
@@ -152,6 +385,157 @@ class AnonymousElectionVote(models.Model):
     def __str__(self):
         return f"Anonymous vote for {self.candidate.name} in {self.position.name}"
 
+
+class StagedElectionVote(models.Model):
+    """
+    Append-only staging table for the queued ingestion mode.
+    A ballot is durably written here with one narrow INSERT and a background
+    drainer moves batches into AnonymousElectionVote, applying counter deltas
+    once per batch. Rows are kept after draining so the unique constraint
+    keeps duplicate detection exact.
+    """
+    voter_hash = models.CharField(max_length=64)
+    candidate = models.ForeignKey(ElectionCandidate, on_delete=models.CASCADE, related_name='staged_votes')
+    position = models.ForeignKey(ElectionPosition, on_delete=models.CASCADE, related_name='staged_votes')
+    session = models.ForeignKey(VotingSession, on_delete=models.PROTECT, related_name='staged_votes')
+    vote_signature = models.CharField(max_length=128)
+    voted_at = models.DateTimeField()
+    ip_hash = models.CharField(max_length=64, blank=True)
+    is_drained = models.BooleanField(db_default=False)
+
+    class Meta:
+        unique_together = ['voter_hash', 'position', 'session']
+        indexes = [
+            models.Index(fields=['is_drained', 'id']),
+        ]
+
+    def __str__(self):
+        return f"Staged vote for {self.candidate_id} in {self.position_id}"
+
+    @classmethod
+    def stage_if_absent(cls, votes):
+        """
+        Stage unsaved AnonymousElectionVote instances.
+        Votes already recorded in AnonymousElectionVote are skipped, and the staging
+        table's own unique constraint rejects repeats. Returns the votes that were staged.
+        """
+        recorded = set(
+            AnonymousElectionVote.objects.filter(
+                session_id__in={vote.session_id for vote in votes},
+                voter_hash__in=[vote.voter_hash for vote in votes]
+            ).values_list('voter_hash', 'position_id', 'session_id')
+        )
+        pending = [
+            vote for vote in votes
+            if (vote.voter_hash, vote.position_id, vote.session_id) not in recorded
+        ]
+
+        staged, _ = _insert_votes_if_absent(cls, [
+            cls(
+                voter_hash=vote.voter_hash,
+                candidate_id=vote.candidate_id,
+                position_id=vote.position_id,
+                session_id=vote.session_id,
+                vote_signature=vote.vote_signature,
+                voted_at=vote.voted_at,
+                ip_hash=vote.ip_hash
+            )
+            for vote in pending
+        ])
+        staged_keys = {(row.voter_hash, row.position_id, row.session_id) for row in staged}
+        return [vote for vote in pending if (vote.voter_hash, vote.position_id, vote.session_id) in staged_keys]
+
+    @classmethod
+    def drain(cls, batch_size=500):
+        """
+        Move one batch of staged votes into AnonymousElectionVote in a single transaction.
+        Counter deltas are applied once per candidate per batch. Concurrent drainers skip
+        rows locked by each other. Returns the number of staged rows processed.
+        """
+        with transaction.atomic():
+            batch = list(
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(is_drained=False)
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                return 0
+
+            inserted, transaction_id = AnonymousElectionVote.insert_if_absent([
+                AnonymousElectionVote(
+                    voter_hash=row.voter_hash,
+                    candidate_id=row.candidate_id,
+                    position_id=row.position_id,
+                    session_id=row.session_id,
+                    vote_signature=row.vote_signature,
+                    voted_at=row.voted_at,
+                    ip_hash=row.ip_hash
+                )
+                for row in batch
+            ])
+
+            for candidate_id, amount in Counter(vote.candidate_id for vote in inserted).items():
+                ElectionCandidateTally.increment(candidate_id, amount)
+
+            from . import live_results
+            live_results.record_votes(inserted, transaction_id)
+
+            cls.objects.filter(id__in=[row.id for row in batch]).update(is_drained=True)
+
+        return len(batch)
+
+
+class FinalElectionResult(models.Model):
+    """
+    Immutable per-candidate result of a finished voting session, written once by
+    final_results.finalize(). Names are copied so the results stay readable if
+    candidates or positions are edited for a later election.
+    """
+    session = models.ForeignKey(VotingSession, on_delete=models.PROTECT, related_name='final_results')
+    position = models.ForeignKey(ElectionPosition, on_delete=models.PROTECT, related_name='final_results')
+    candidate = models.ForeignKey(ElectionCandidate, on_delete=models.PROTECT, related_name='final_results')
+    position_name = models.CharField(max_length=100)
+    candidate_name = models.CharField(max_length=100)
+    votes = models.IntegerField()
+    position_total_votes = models.IntegerField()
+    percentage = models.FloatField()
+    rank = models.PositiveSmallIntegerField()  # 1 = winner of the position
+
+    class Meta:
+        unique_together = ['session', 'candidate']
+        ordering = ['session', 'position', 'rank']
+
+    def __str__(self):
+        return f"{self.candidate_name} - {self.position_name}: {self.votes} ({self.session.name})"
+
+
+class VoteLogNode(models.Model):
+    """
+    Node of the append-only Merkle tree over AnonymousElectionVote.
+    Level 0 holds the leaves in log order; node (level, index) covers leaves
+    [index * 2^level, (index + 1) * 2^level), which makes the root identical to
+    the RFC 6962 Merkle tree hash of the log.
+    """
+    level = models.PositiveSmallIntegerField()
+    node_index = models.BigIntegerField()
+    hash = models.CharField(max_length=64)
+
+    class Meta:
+        unique_together = ['level', 'node_index']
+
+    def __str__(self):
+        return f"Vote log node {self.level}/{self.node_index}"
+
+
+class VoteLogCheckpoint(models.Model):
+    """Published root hash of the vote log after each appended batch"""
+    tree_size = models.BigIntegerField(unique=True)
+    root_hash = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Vote log root at {self.tree_size} votes"
+
 # ========== HUEL (COURSE) MODELS ==========
 
 class Department(models.Model):
@@ -173,6 +557,14 @@ class Huel(models.Model):
     avg_grading = models.FloatField(default=0.0)
     avg_toughness = models.FloatField(default=0.0)
     avg_overall = models.FloatField(default=0.0)
+    rating_count = models.IntegerField(default=0)
+    combined_score = models.FloatField(default=0.0)  # Served as avg_overall, see combine_averages()
+    # Running sums of the individual ratings; the averages above are derived from them
+    sum_grading = models.FloatField(default=0.0)
+    sum_toughness = models.FloatField(default=0.0)
+    sum_overall = models.FloatField(default=0.0)
+    # Normalized forms of the code for search, see build_search_key()
+    search_key = models.CharField(max_length=50, blank=True, editable=False)
     
     upvotes = models.IntegerField(default=0)
     downvotes = models.IntegerField(default=0)
@@ -181,21 +573,104 @@ class Huel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Keyset pagination of the huels list, one per sort column (see main.pagination)
+        indexes = [
+            models.Index(fields=['avg_overall', 'id'], name='huel_avg_overall_id_idx'),
+            models.Index(fields=['avg_grading', 'id'], name='huel_avg_grading_id_idx'),
+            models.Index(fields=['avg_toughness', 'id'], name='huel_avg_toughness_id_idx'),
+        ]
+
     def __str__(self):
         return f"{self.code} - {self.name}"
 
-    def update_ratings(self):
-        """Update aggregated ratings from individual ratings"""
-        ratings = self.ratings.all()
-        if ratings.exists():
-            self.avg_grading = ratings.aggregate(avg=models.Avg('grading'))['avg'] or 0
-            self.avg_toughness = ratings.aggregate(avg=models.Avg('toughness'))['avg'] or 0
-            self.avg_overall = ratings.aggregate(avg=models.Avg('overall'))['avg'] or 0
-        else:
-            self.avg_grading = self.avg_toughness = self.avg_overall = 0
-        self.save()
+    def save(self, *args, **kwargs):
+        self.search_key = self.build_search_key(self.code)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def build_search_key(code):
+        """
+        The code lowercased with only letters and digits kept, plus the same without
+        the series letter: "HSS F222" gives "hssf222 hss222". Search matches any part
+        of it, so "f222" finds the huel too; typeahead matches prefixes and indexes
+        the code's trailing words for that (see huel_suggest)
+        """
+        compact = re.sub(r'[\W_]+', '', code.lower())
+        keys = [compact]
+        match = re.match(r'([^\W\d_]+)\s+[^\W\d_](\d\w*)$', code.strip().lower())
+        if match and match.group(1) + match.group(2) != compact:
+            keys.append(match.group(1) + match.group(2))
+        return ' '.join(keys)
+
+    @staticmethod
+    def combine_averages(avg_grading, avg_toughness, avg_overall):
+        """Overall score shown to users: the mean of the three averages"""
+        if avg_grading and avg_toughness and avg_overall:
+            return (avg_grading + avg_toughness + avg_overall) / 3
+        return avg_overall or 0.0
+
+    @classmethod
+    def apply_rating_change(cls, huel_id, count_delta, deltas):
+        """
+        Add a rating change to the running sums with a single UPDATE, which also
+        re-derives the averages from the new sums: count_delta is +1 for a new
+        rating, 0 for a changed one and -1 for a deleted one, and deltas maps each
+        of RATING_FIELDS to the new minus the old value. Costs the same however
+        many ratings the huel has.
+        """
+        count = models.F('rating_count') + count_delta
+        remaining = models.Q(rating_count__gt=-count_delta)
+        updates = {'rating_count': count, 'updated_at': timezone.now()}
+        total = None
+        for field in HuelRating.RATING_FIELDS:
+            new_sum = models.F(f'sum_{field}') + deltas[field]
+            updates[f'sum_{field}'] = new_sum
+            updates[f'avg_{field}'] = models.Case(
+                models.When(remaining, then=new_sum / count), default=models.Value(0.0)
+            )
+            total = new_sum if total is None else total + new_sum
+        # Ratings are 1-5, so every average is non-zero and combine_averages() is their plain mean
+        updates['combined_score'] = models.Case(
+            models.When(remaining, then=total / (count * 3)), default=models.Value(0.0)
+        )
+        cls.objects.filter(pk=huel_id).update(**updates)
+
+    @classmethod
+    def rebuild_ratings(cls):
+        """
+        Recompute the running sums, counts and averages of every huel from its
+        ratings, for repair. Returns a list of (huel, old_count, new_count) for the
+        huels whose stored aggregates drifted.
+        """
+        aggregate_fields = ['rating_count', 'avg_grading', 'avg_toughness', 'avg_overall', 'combined_score']
+        aggregate_fields += [f'sum_{field}' for field in HuelRating.RATING_FIELDS]
+        huels = list(cls.objects.annotate(
+            actual_count=models.Count('ratings'),
+            actual_grading=models.Sum('ratings__grading'),
+            actual_toughness=models.Sum('ratings__toughness'),
+            actual_overall=models.Sum('ratings__overall'),
+        ))
+
+        drifted = []
+        for huel in huels:
+            stored = [getattr(huel, field) for field in aggregate_fields]
+            old_count = huel.rating_count
+            huel.rating_count = huel.actual_count
+            for field in HuelRating.RATING_FIELDS:
+                total = getattr(huel, f'actual_{field}') or 0.0
+                setattr(huel, f'sum_{field}', total)
+                setattr(huel, f'avg_{field}', total / huel.rating_count if huel.rating_count else 0.0)
+            huel.combined_score = cls.combine_averages(huel.avg_grading, huel.avg_toughness, huel.avg_overall)
+            if [getattr(huel, field) for field in aggregate_fields] != stored:
+                drifted.append((huel, old_count, huel.rating_count))
+
+        cls.objects.bulk_update([huel for huel, _, _ in drifted], aggregate_fields, batch_size=1000)
+        return drifted
 
 class HuelRating(models.Model):
+    RATING_FIELDS = ('grading', 'toughness', 'overall')
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     huel = models.ForeignKey(Huel, on_delete=models.CASCADE, related_name='ratings')
     
@@ -210,14 +685,40 @@ class HuelRating(models.Model):
     class Meta:
         unique_together = ['user', 'huel']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Values as stored, so a later save() can apply the difference to the huel's sums
+        instance._stored_values = {field: instance.__dict__.get(field) for field in cls.RATING_FIELDS}
+        return instance
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.huel.update_ratings()
+        adding = self._state.adding
+        stored = getattr(self, '_stored_values', {})
+        with transaction.atomic():
+            if not adding and None in [stored.get(field) for field in self.RATING_FIELDS]:
+                stored = HuelRating.objects.select_for_update().values(*self.RATING_FIELDS).get(pk=self.pk)
+            super().save(*args, **kwargs)
+            if adding:
+                Huel.apply_rating_change(self.huel_id, 1, {field: getattr(self, field) for field in self.RATING_FIELDS})
+            else:
+                Huel.apply_rating_change(self.huel_id, 0, {
+                    field: getattr(self, field) - stored[field] for field in self.RATING_FIELDS
+                })
+        self._stored_values = {field: getattr(self, field) for field in self.RATING_FIELDS}
 
     def __str__(self):
         return f"{self.user.username} rated {self.huel.code}"
 
 
+@receiver(post_delete, sender=HuelRating)
+def _rating_deleted(sender, instance, **kwargs):
+    # Also runs for queryset and cascade deletes; a deleted huel simply matches no row
+    Huel.apply_rating_change(instance.huel_id, -1, {
+        field: -getattr(instance, field) for field in HuelRating.RATING_FIELDS
+    })
+
+
 class HuelComment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     huel = models.ForeignKey(Huel, on_delete=models.CASCADE, related_name='comments')
@@ -252,7 +753,7 @@ class DepartmentClub(models.Model):
     # For departments: achievements, For clubs: activities
     highlights = models.JSONField(default=list)
     
-    vote_count = models.IntegerField(default=0)
+    vote_count = models.IntegerField(default=0)  # Kept up to date by DepartmentClubVote writes
     image = models.URLField(blank=True)
     
     is_active = models.BooleanField(default=True)
@@ -260,10 +761,29 @@ class DepartmentClub(models.Model):
 
     class Meta:
         unique_together = ['name', 'type']
+        indexes = [
+            # Keyset pagination by vote_count (see main.pagination), and ranks within a type and size
+            models.Index(fields=['vote_count', 'id'], name='deptclub_vote_count_id_idx'),
+            models.Index(fields=['type', 'size', 'vote_count', 'id'], name='deptclub_type_votes_id_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_type_display()})"
 
+    @classmethod
+    def rebuild_vote_counts(cls):
+        """
+        Recompute vote_count of every item from its votes, for repair. Returns a
+        list of (item, old_count, new_count) for the items whose count drifted.
+        """
+        drifted = []
+        for item in cls.objects.annotate(actual_count=models.Count('votes')):
+            if item.vote_count != item.actual_count:
+                drifted.append((item, item.vote_count, item.actual_count))
+                item.vote_count = item.actual_count
+        cls.objects.bulk_update([item for item, _, _ in drifted], ['vote_count'], batch_size=1000)
+        return drifted
+
 class DepartmentClubVote(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     department_club = models.ForeignKey(DepartmentClub, on_delete=models.CASCADE, related_name='votes')
@@ -276,6 +796,24 @@ class DepartmentClubVote(models.Model):
     def __str__(self):
         return f"{self.user.username} voted for {self.department_club.name}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                DepartmentClub.objects.filter(pk=self.department_club_id).update(
+                    vote_count=models.F('vote_count') + 1
+                )
+
+
+@receiver(post_delete, sender=DepartmentClubVote)
+def _department_club_vote_deleted(sender, instance, **kwargs):
+    # Also runs for queryset and cascade deletes; a deleted item simply matches no row
+    DepartmentClub.objects.filter(pk=instance.department_club_id).update(
+        vote_count=models.F('vote_count') - 1
+    )
+
+
 class DepartmentClubComment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     department_club = models.ForeignKey(DepartmentClub, on_delete=models.CASCADE, related_name='comments')
@@ -288,6 +826,21 @@ class DepartmentClubComment(models.Model):
 
 # ========== USER PROFILE ==========
 
+class JSONArrayConcat(models.Func):
+    """Concatenation of JSON arrays, evaluated by the database"""
+    output_field = models.JSONField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection, template='(%(expressions)s)', arg_joiner=' || ', **extra_context)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template='(SELECT json_group_array(value) FROM (SELECT value FROM json_each(%(expressions)s)))',
+            arg_joiner=') UNION ALL SELECT value FROM json_each(',
+            **extra_context
+        )
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     google_id = models.CharField(max_length=100, unique=True, null=True, blank=True)
@@ -297,8 +850,40 @@ class UserProfile(models.Model):
     # Voting status flags (boolean only, not who they voted for)
     voted_president = models.BooleanField(default=False)
     voted_gen_sec = models.BooleanField(default=False)
+    # Ids of the positions voted for in voted_session; reset by the first vote of a new session
+    voted_session = models.ForeignKey(
+        VotingSession, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    voted_positions = models.JSONField(default=list, blank=True)
     
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.user.username}'s profile"
\ No newline at end of file
+        return f"{self.user.username}'s profile"
+
+    def voted_position_ids(self, session_id):
+        """Positions this user has voted for in a session, without a query"""
+        if self.voted_session_id != session_id:
+            return set()
+        return set(self.voted_positions)
+
+    @classmethod
+    def mark_voted(cls, user_id, session_id, position_ids, **flags):
+        """
+        Record votes for the given positions with a single UPDATE, inside the
+        caller's vote transaction so the record and the votes commit together.
+        Returns the number of profiles updated (0 if the user has none yet).
+        """
+        position_ids = models.Value(list(position_ids), output_field=models.JSONField())
+        return cls.objects.filter(user_id=user_id).update(
+            voted_positions=models.Case(
+                models.When(
+                    voted_session_id=session_id,
+                    then=JSONArrayConcat(models.F('voted_positions'), position_ids)
+                ),
+                default=position_ids,
+                output_field=models.JSONField(),
+            ),
+            voted_session_id=session_id,
+            **flags
+        )
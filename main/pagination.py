@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination for the catalogue lists.
+
+A list is ordered by one sort column and then the id, both in the same
+direction, and the opaque `next` cursor holds the sort value and id of the last
+row of the page. The following page starts right after that row with
+
+    sort <= value AND (sort < value OR id < last_id)      (descending)
+
+whose first condition bounds a scan of the (sort, id) index, so page 50 costs
+the same as page 1 however large the list grows. Lists are served as
+{"results": [...], "next": cursor or null}; ?all=1 returns the whole list as a
+plain array like these endpoints did before.
+"""
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+
+class InvalidCursor(ValueError):
+    pass
+
+def wants_all(request):
+    """Whether the client asked for the legacy unpaginated list"""
+    return request.GET.get('all', '').lower() in ('1', 'true')
+
+def page_size(request):
+    """?limit= capped at LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE without it"""
+    try:
+        limit = int(request.GET.get('limit', settings.LIST_PAGE_SIZE))
+    except ValueError:
+        limit = settings.LIST_PAGE_SIZE
+    return min(max(limit, 1), settings.LIST_MAX_PAGE_SIZE)
+
+def ordering(field, descending):
+    return [f'-{field}', '-id'] if descending else [field, 'id']
+
+def encode_cursor(sort, value, pk):
+    return base64.urlsafe_b64encode(json.dumps([sort, value, pk]).encode()).decode()
+
+def decode_cursor(cursor, sort):
+    """(value, id) of a cursor made for the same sort, or InvalidCursor"""
+    try:
+        cursor_sort, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if cursor_sort != sort or not isinstance(pk, int) or not isinstance(value, (int, float)):
+        raise InvalidCursor('Cursor does not match this sort, start again without it')
+    return value, pk
+
+def paginate(queryset, request, sort, field, descending):
+    """
+    One page of queryset ordered by field (a column or annotation) and id, after
+    ?cursor= when given. sort names the ordering inside cursors so a cursor
+    can't be replayed against another one. Returns (rows, next_cursor), with
+    next_cursor None on the last page; raises InvalidCursor for a bad ?cursor=.
+    """
+    queryset = queryset.order_by(*ordering(field, descending))
+    cursor = request.GET.get('cursor')
+    if cursor:
+        value, pk = decode_cursor(cursor, sort)
+        if descending:
+            queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(id__lt=pk), **{f'{field}__lte': value})
+        else:
+            queryset = queryset.filter(Q(**{f'{field}__gt': value}) | Q(id__gt=pk), **{f'{field}__gte': value})
+
+    limit = page_size(request)
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(sort, getattr(last, field), last.pk)
+    return rows, next_cursor
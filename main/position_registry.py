@@ -0,0 +1,56 @@
+"""
+Per-process registry of the active election positions.
+
+The active positions are loaded with one query and kept in this worker's memory,
+keyed by id and by slug, so the results and candidate endpoints can iterate them
+without a query of their own. Saving or deleting a position (signals below)
+invalidates it; see process_cache for how other workers pick the change up.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import ElectionPosition
+from .process_cache import ProcessCache
+
+# Response keys of the positions the frontend knows by name, by slug;
+# every other position is keyed by its slug
+LEGACY_POSITION_KEYS = {
+    'president': 'president',
+    'general-secretary': 'gensec',
+}
+
+def _load():
+    positions = list(ElectionPosition.objects.filter(is_active=True).order_by('id'))
+    return {
+        'positions': positions,
+        'by_id': {position.id: position for position in positions},
+        'by_slug': {position.slug: position for position in positions},
+    }
+
+_registry = ProcessCache('election-positions', _load)
+
+def positions():
+    """Active positions in creation order"""
+    return _registry.get()['positions']
+
+def by_id(position_id):
+    return _registry.get()['by_id'].get(position_id)
+
+def by_slug(slug):
+    return _registry.get()['by_slug'].get(slug)
+
+def response_key(slug):
+    """Key of a position in the results and candidates responses"""
+    return LEGACY_POSITION_KEYS.get(slug, slug)
+
+def empty_response(value):
+    """{legacy key: value()} so the keys the frontend expects are always present"""
+    return {key: value() for key in LEGACY_POSITION_KEYS.values()}
+
+def invalidate():
+    _registry.invalidate()
+
+@receiver(post_save, sender=ElectionPosition)
+@receiver(post_delete, sender=ElectionPosition)
+def _position_changed(sender, **kwargs):
+    invalidate()
@@ -0,0 +1,53 @@
+"""
+Values kept in each worker's memory until a change anywhere invalidates them.
+
+A ProcessCache loads its value with loader() on first use. invalidate() drops
+this worker's copy and, once the surrounding transaction commits, sets a new
+generation number in the shared cache; every worker compares its generation at
+most every PROCESS_CACHE_CHECK_SECONDS and reloads when it moved.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+class ProcessCache:
+
+    def __init__(self, name, loader):
+        self.generation_key = f'process-cache:{name}:generation'
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None  # Shared by every request of the worker, treat as read-only
+        self._generation = None
+        self._checked_at = 0.0
+
+    def get(self):
+        """The value, reloaded when another worker has invalidated it"""
+        now = time.monotonic()
+        with self._lock:
+            if self._loaded and now - self._checked_at < settings.PROCESS_CACHE_CHECK_SECONDS:
+                return self._value
+
+        generation = cache.get(self.generation_key, 0)
+        with self._lock:
+            self._checked_at = now
+            if self._loaded and generation == self._generation:
+                return self._value
+
+        value = self.loader()
+        with self._lock:
+            self._loaded, self._value, self._generation = True, value, generation
+        return value
+
+    def _bump(self):
+        with self._lock:
+            self._loaded = False
+        # A fresh value rather than a counter, so an evicted key can never repeat an old one
+        cache.set(self.generation_key, time.time_ns(), None)
+
+    def invalidate(self):
+        """Drop this worker's copy and make every other worker reload, once the change commits"""
+        transaction.on_commit(self._bump)
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from . import session_cache
 from .models import (
-    ElectionPosition, ElectionCandidate, AnonymousElectionVote,
+    ElectionPosition, ElectionCandidate, ElectionCandidateTally, AnonymousElectionVote,
     Department, Huel, HuelRating, HuelComment,
     DepartmentClub, DepartmentClubVote, DepartmentClubComment,
     UserProfile
@@ -16,10 +17,21 @@ class UserSerializer(serializers.ModelSerializer):
 
 class UserProfileSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
+    voted_positions = serializers.SerializerMethodField()
+    
+    def get_voted_positions(self, obj):
+        """Ids of the positions voted for in the current SU election"""
+        session = session_cache.current('su_election')
+        if session is None:
+            return []
+        return sorted(obj.voted_position_ids(session.id))
     
     class Meta:
         model = UserProfile
-        fields = ['user', 'google_id', 'picture', 'is_verified', 'voted_president', 'voted_gen_sec', 'created_at']
+        fields = [
+            'user', 'google_id', 'picture', 'is_verified', 'voted_president', 'voted_gen_sec',
+            'voted_positions', 'created_at'
+        ]
 
 # ========== ELECTION SERIALIZERS ==========
 
@@ -31,33 +43,47 @@ class ElectionPositionSerializer(serializers.ModelSerializer):
         return obj.candidates.filter(is_active=True).count()
     
     def get_total_votes(self, obj):
-        return obj.candidates.aggregate(total=serializers.models.Sum('vote_count'))['total'] or 0
+        return ElectionCandidateTally.merged_view()['positions'].get(obj.id, 0)
     
     class Meta:
         model = ElectionPosition
-        fields = ['id', 'name', 'description', 'is_active', 'candidate_count', 'total_votes', 'created_at']
+        fields = ['id', 'name', 'slug', 'description', 'is_active', 'candidate_count', 'total_votes', 'created_at']
 
 class ElectionCandidateSerializer(serializers.ModelSerializer):
     position_name = serializers.CharField(source='position.name', read_only=True)
+    vote_count = serializers.SerializerMethodField()
     vote_percentage = serializers.SerializerMethodField()
     user_has_voted = serializers.SerializerMethodField()
     image = serializers.SerializerMethodField()
     
+    def get_vote_count(self, obj):
+        vote_counts = self.context.get('vote_counts')
+        if vote_counts is not None:
+            return vote_counts.get(obj.id, 0)
+        return obj.get_live_vote_count()
+
     def get_vote_percentage(self, obj):
-        return obj.get_vote_percentage()
+        vote_counts = self.context.get('vote_counts')
+        position_totals = self.context.get('position_totals')
+        if vote_counts is None or position_totals is None:
+            return obj.get_vote_percentage()
+
+        total_votes = position_totals.get(obj.position_id, 0)
+        if total_votes == 0:
+            return 0
+        return round((vote_counts.get(obj.id, 0) / total_votes) * 100, 1)
     
     def get_user_has_voted(self, obj):
+        voted_position_ids = self.context.get('voted_position_ids')
+        if voted_position_ids is not None:
+            return obj.position_id in voted_position_ids
+
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            # Check anonymous votes using voter hash
-            voter_hash = AnonymousElectionVote.create_voter_hash(
-                request.user.id, 
-                obj.position.id
-            )
-            return AnonymousElectionVote.objects.filter(
-                voter_hash=voter_hash, 
-                position=obj.position
-            ).exists()
+            session = session_cache.current('su_election')
+            profile = getattr(request.user, 'profile', None)
+            if session is not None and profile is not None:
+                return obj.position_id in profile.voted_position_ids(session.id)
         return False
     
     def get_image(self, obj):
@@ -146,14 +172,18 @@ class HuelSerializer(serializers.ModelSerializer):
     department_name = serializers.CharField(source='department.short_name', read_only=True)
     comments = HuelCommentSerializer(many=True, read_only=True)
     user_rating = serializers.SerializerMethodField()
-    rating_count = serializers.SerializerMethodField()
     upvotes = serializers.SerializerMethodField()
     downvotes = serializers.SerializerMethodField()
-    avg_grading = serializers.SerializerMethodField()
-    avg_toughness = serializers.SerializerMethodField()
-    avg_overall = serializers.SerializerMethodField()
+    # Aggregates are kept on the huel by HuelRating writes
+    avg_overall = serializers.FloatField(source='combined_score', read_only=True)
     
     def get_user_rating(self, obj):
+        # Views pass the user's ratings of the listed huels, fetched in one query
+        user_ratings = self.context.get('user_ratings')
+        if user_ratings is not None:
+            rating = user_ratings.get(obj.id)
+            return HuelRatingSerializer(rating).data if rating else None
+
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
@@ -163,10 +193,6 @@ class HuelSerializer(serializers.ModelSerializer):
                 return None
         return None
     
-    
-    def get_rating_count(self, obj):
-        return obj.ratings.count()
-    
     def get_upvotes(self, obj):
         # Upvotes removed - return 0
         return 0
@@ -175,33 +201,6 @@ class HuelSerializer(serializers.ModelSerializer):
         # Downvotes removed - return 0
         return 0
     
-    def get_avg_grading(self, obj):
-        from django.db.models import Avg
-        avg = obj.ratings.aggregate(avg=Avg('grading'))['avg']
-        return avg if avg else 0.0
-    
-    def get_avg_toughness(self, obj):
-        from django.db.models import Avg
-        avg = obj.ratings.aggregate(avg=Avg('toughness'))['avg']
-        return avg if avg else 0.0
-    
-    def get_avg_overall(self, obj):
-        # Calculate overall as average of grading, toughness, and overall rating
-        from django.db.models import Avg
-        ratings = obj.ratings.aggregate(
-            avg_grading=Avg('grading'),
-            avg_toughness=Avg('toughness'),
-            avg_overall=Avg('overall')
-        )
-        
-        # If we have ratings, calculate the average of all three
-        if ratings['avg_grading'] and ratings['avg_toughness'] and ratings['avg_overall']:
-            return (ratings['avg_grading'] + ratings['avg_toughness'] + ratings['avg_overall']) / 3
-        elif ratings['avg_overall']:
-            return ratings['avg_overall']
-        else:
-            return 0.0
-    
     class Meta:
         model = Huel
         fields = [
@@ -249,42 +248,35 @@ class DepartmentClubSerializer(serializers.ModelSerializer):
     rank = serializers.SerializerMethodField()
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     size_display = serializers.CharField(source='get_size_display', read_only=True)
-    vote_count = serializers.SerializerMethodField()
+    # Kept on the item by DepartmentClubVote writes
+    vote_count = serializers.IntegerField(read_only=True)
     
     def get_user_has_voted(self, obj):
+        # Views pass the ids of the listed items the user voted for, fetched in one query
+        voted_items = self.context.get('voted_items')
+        if voted_items is not None:
+            return obj.id in voted_items
+
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.votes.filter(user=request.user).exists()
         return False
     
-    def get_vote_count(self, obj):
-        # Return actual vote count from related votes
-        return obj.votes.count()
-    
     def get_rank(self, obj):
-        # Calculate rank based on actual vote count within the same type and size
-        from django.db.models import Count
-        
-        # Get all items of same type with their vote counts
+        # Views annotate the rank, see department_club_queryset()
+        rank = getattr(obj, 'rank', None)
+        if rank is not None:
+            return rank
+
+        # Otherwise count the items of the same type and size with more votes
         queryset = DepartmentClub.objects.filter(
             type=obj.type,
-            is_active=True
-        ).annotate(
-            actual_vote_count=Count('votes')
+            is_active=True,
+            vote_count__gt=obj.vote_count
         )
-        
         if obj.size:
             queryset = queryset.filter(size=obj.size)
-        
-        # Get current item's vote count
-        current_votes = obj.votes.count()
-        
-        # Count how many have more votes
-        higher_vote_count = queryset.filter(
-            actual_vote_count__gt=current_votes
-        ).count()
-        
-        return higher_vote_count + 1
+        return queryset.count() + 1
     
     class Meta:
         model = DepartmentClub
@@ -0,0 +1,58 @@
+"""
+Per-process cache of every VotingSession.
+
+All sessions are loaded with one query and kept in this worker's memory, so the
+voting status endpoints and the vote endpoints' "is voting open" check cost no
+query. Status transitions at voting_start_time/voting_end_time are computed from
+the cached times. Saving or deleting a session (signals below) and the admin
+activate/deactivate actions call invalidate(); see process_cache for how other
+workers pick the change up.
+"""
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import VotingSession
+from .process_cache import ProcessCache
+
+_sessions = ProcessCache(
+    'voting-sessions', lambda: list(VotingSession.objects.order_by('-is_active', '-created_at'))
+)
+
+def get_sessions():
+    """All sessions, most relevant first"""
+    return _sessions.get()
+
+def current(voting_type):
+    """Same as VotingSession.current(), from the cache"""
+    for session in get_sessions():
+        if session.voting_type == voting_type:
+            return session
+    return None
+
+def for_votes(voting_type):
+    """Same as VotingSession.for_votes(), from the cache"""
+    session = current(voting_type)
+    if session is None:
+        session = VotingSession.for_votes(voting_type)
+        invalidate()
+    return session
+
+def next_transition():
+    """Earliest voting_start_time/voting_end_time of an active session still ahead, or None"""
+    now = timezone.now()
+    upcoming = [
+        moment
+        for session in get_sessions() if session.is_active
+        for moment in (session.voting_start_time, session.voting_end_time)
+        if moment is not None and moment > now
+    ]
+    return min(upcoming, default=None)
+
+def invalidate():
+    _sessions.invalidate()
+
+@receiver(post_save, sender=VotingSession)
+@receiver(post_delete, sender=VotingSession)
+def _session_changed(sender, **kwargs):
+    invalidate()
@@ -0,0 +1,276 @@
+import abc
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from . import live_results, session_cache, voting_control_views
+
+# ========== SHARED PRODUCERS ==========
+
+class PollingBroadcaster(abc.ABC):
+    """
+    One producer per process that polls a shared value and wakes every waiting
+    request when it changes, so the number of waiting clients never adds
+    database or cache load. Subclasses implement _refresh() and poll_delay().
+    The producer stops when the last subscriber leaves; the next one refreshes the
+    value before reading it.
+    """
+
+    def __init__(self):
+        self._changed = asyncio.Event()
+        self._subscribers = 0
+        self._task = None
+        self._ready = None  # Refresh the current subscribers wait for before reading
+
+    async def subscribe(self):
+        self._subscribers += 1
+        if self._task is None or self._task.done():
+            # Nothing kept the value current while no one was subscribed
+            self._task = asyncio.create_task(self._produce())
+            self._ready = None
+        if self._ready is None or (self._ready.done() and self._ready.exception() is not None):
+            self._ready = asyncio.ensure_future(self._refresh())
+        # Subscribers arriving meanwhile share the refresh; a cancelled request doesn't cancel it
+        try:
+            await asyncio.shield(self._ready)
+        except BaseException:
+            # The caller only unsubscribes once subscribe() returns
+            self._subscribers -= 1
+            raise
+
+    def unsubscribe(self):
+        self._subscribers -= 1
+
+    async def wait_for_change(self, timeout):
+        """Wait until a new version is published; False on timeout"""
+        changed = self._changed
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _publish(self):
+        # Wake everyone waiting on the old event and start a new one for the next change
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    @abc.abstractmethod
+    def poll_delay(self):
+        """Seconds until the next refresh"""
+
+    @abc.abstractmethod
+    async def _refresh(self):
+        """Reload the shared value and _publish() if it changed"""
+
+    async def _produce(self):
+        while self._subscribers > 0:
+            await asyncio.sleep(self.poll_delay())
+            if self._subscribers == 0:
+                break
+            try:
+                await self._refresh()
+            except Exception:
+                # Keep serving the last value; the next tick retries
+                continue
+
+
+class ResultsBroadcaster(PollingBroadcaster):
+    """
+    Producer for the live results stream.
+    It polls the results snapshot version and, when it moves, computes the delta
+    once for every connected viewer.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.version = None
+        self.previous_version = None
+        self.results = None
+        self.delta = None
+
+    def poll_delay(self):
+        return settings.RESULTS_STREAM_POLL_SECONDS
+
+    async def _refresh(self):
+        version, results = await sync_to_async(live_results.get_rendered_results)()
+        if version == self.version:
+            return
+
+        self.previous_version, self.version = self.version, version
+        self.delta = results_delta(self.results, results) if self.results is not None else None
+        self.results = results
+        self._publish()
+
+
+class VotingStatusWatcher(PollingBroadcaster):
+    """
+    Producer for the voting status long-poll.
+    It recomputes every voting type's status from the session cache, which picks
+    up admin changes, and wakes up right after the next scheduled
+    voting_start_time/voting_end_time so those transitions are seen on time.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.statuses = None
+        self.next_transition = None
+
+    def poll_delay(self):
+        delay = settings.VOTING_STATUS_POLL_SECONDS
+        if self.next_transition is not None:
+            until_transition = (self.next_transition - timezone.now()).total_seconds()
+            # The status flips strictly after the boundary
+            delay = min(delay, max(0, until_transition) + 0.01)
+        return delay
+
+    def _load(self):
+        return voting_control_views.all_voting_statuses(), session_cache.next_transition()
+
+    async def _refresh(self):
+        statuses, self.next_transition = await sync_to_async(self._load)()
+        if statuses == self.statuses:
+            return
+
+        self.statuses = statuses
+        self._publish()
+
+
+def results_delta(old, new):
+    """Fields of the rendered results that changed between two versions"""
+    delta = {}
+    for key, value in new.items():
+        if not isinstance(value, dict):
+            if old.get(key) != value:
+                delta[key] = value
+            continue
+
+        old_position = old.get(key) or {'total_votes': 0, 'candidates': []}
+        old_candidates = {candidate['name']: candidate for candidate in old_position['candidates']}
+        changed_candidates = [
+            candidate for candidate in value['candidates']
+            if old_candidates.get(candidate['name']) != candidate
+        ]
+        if changed_candidates or old_position['total_votes'] != value['total_votes']:
+            delta[key] = {'total_votes': value['total_votes'], 'candidates': changed_candidates}
+    return delta
+
+
+_results_broadcaster = None
+_voting_status_watcher = None
+
+def get_results_broadcaster():
+    global _results_broadcaster
+    if _results_broadcaster is None:
+        _results_broadcaster = ResultsBroadcaster()
+    return _results_broadcaster
+
+def get_voting_status_watcher():
+    global _voting_status_watcher
+    if _voting_status_watcher is None:
+        _voting_status_watcher = VotingStatusWatcher()
+    return _voting_status_watcher
+
+# ========== STREAMING ENDPOINTS ==========
+
+def _sse_event(event, version, data):
+    return f"event: {event}\nid: {version}\ndata: {json.dumps(data)}\n\n"
+
+@require_GET
+async def election_live_stream(request):
+    """
+    Server-Sent Events stream of live election results.
+    Sends a `snapshot` event on connect, `delta` events with only the changed
+    fields whenever the results move, and a comment heartbeat while idle.
+    Only served by the ASGI application (see the stream service).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "The live stream is only available over ASGI"}, status=503)
+
+    broadcaster = get_results_broadcaster()
+    last_event_id = request.headers.get('Last-Event-ID')
+
+    async def events():
+        await broadcaster.subscribe()
+        try:
+            if last_event_id != str(broadcaster.version):
+                yield _sse_event('snapshot', broadcaster.version, broadcaster.results)
+            sent_version = broadcaster.version
+
+            while True:
+                if not await broadcaster.wait_for_change(settings.RESULTS_STREAM_HEARTBEAT_SECONDS):
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if broadcaster.delta is not None and broadcaster.previous_version == sent_version:
+                    yield _sse_event('delta', broadcaster.version, broadcaster.delta)
+                else:
+                    # Missed a version; resynchronise with the full results
+                    yield _sse_event('snapshot', broadcaster.version, broadcaster.results)
+                sent_version = broadcaster.version
+        finally:
+            broadcaster.unsubscribe()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _long_poll_timeout(request):
+    """?timeout= in seconds, capped at VOTING_STATUS_LONG_POLL_SECONDS"""
+    try:
+        timeout = float(request.GET.get('timeout', settings.VOTING_STATUS_LONG_POLL_SECONDS))
+    except ValueError:
+        timeout = settings.VOTING_STATUS_LONG_POLL_SECONDS
+    return min(max(timeout, 0), settings.VOTING_STATUS_LONG_POLL_SECONDS)
+
+@require_GET
+async def voting_status_long_poll(request, voting_type=None):
+    """
+    Long-poll variant of voting/status/.
+    Returns as soon as the status version differs from ?version= (right away when
+    it's missing or stale), otherwise waits for a transition up to ?timeout=
+    seconds and then returns the unchanged status with the same version.
+    Only served by the ASGI application (see the stream service).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({"error": "Long polling is only available over ASGI"}, status=503)
+    if voting_type is not None and voting_type not in voting_control_views.VOTING_TYPES:
+        return JsonResponse({"error": f"Unknown voting type: {voting_type}"}, status=404)
+
+    def current():
+        if voting_type is None:
+            statuses = watcher.statuses
+            return {'statuses': statuses, 'version': voting_control_views.status_version(statuses)}
+        voting_status_info = watcher.statuses[voting_type]
+        return {
+            'voting_type': voting_type,
+            **voting_status_info,
+            'version': voting_control_views.status_version(voting_status_info),
+        }
+
+    watcher = get_voting_status_watcher()
+    known_version = request.GET.get('version')
+    await watcher.subscribe()
+    try:
+        payload = current()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + _long_poll_timeout(request)
+        while payload['version'] == known_version:
+            remaining = deadline - loop.time()
+            if remaining <= 0 or not await watcher.wait_for_change(remaining):
+                break
+            # Another voting type may have changed; check ours again
+            payload = current()
+    finally:
+        watcher.unsubscribe()
+
+    response = JsonResponse(payload)
+    response['Cache-Control'] = 'no-cache'
+    return response
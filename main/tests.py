@@ -1,3 +1,526 @@
-from django.test import TestCase
+import asyncio
+import base64
+import hashlib
+import json
+import time
+from io import StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import AsyncClient, AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.decorators import api_view
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import pagination, streaming_views, throttling, vote_log, voting_control_views
+from .models import (
+    AnonymousElectionVote, Department, ElectionCandidate, ElectionPosition,
+    Huel, HuelRating, UserProfile, VoteLogCheckpoint, VotingSession
+)
+
+# ========== VOTE LOG ==========
+
+def reference_root(leaves):
+    """RFC 6962 Merkle tree hash, computed recursively from every leaf"""
+    if not leaves:
+        return hashlib.sha256(b'').hexdigest()
+    if len(leaves) == 1:
+        return leaves[0]
+    split = 1 << ((len(leaves) - 1).bit_length() - 1)  # Largest power of two below the size
+    return vote_log.node_hash(reference_root(leaves[:split]), reference_root(leaves[split:]))
+
+
+class VoteLogTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.session = VotingSession.objects.create(name='SU', voting_type='su_election', is_active=True)
+            self.position = ElectionPosition.objects.create(name='President')
+        self.candidates = [
+            ElectionCandidate.objects.create(name=name, position=self.position, manifesto='m') for name in 'AB'
+        ]
+        for user_id in range(1, 12):
+            self.cast(user_id)
+        # Several batches, so later batches build on nodes stored by earlier ones
+        vote_log.append_all_pending_votes(batch_size=4)
+
+    def cast(self, user_id):
+        voted_at = timezone.now()
+        voter_hash = AnonymousElectionVote.create_voter_hash(user_id, self.position.id)
+        candidate = self.candidates[user_id % 2]
+        return AnonymousElectionVote.objects.create(
+            voter_hash=voter_hash,
+            candidate=candidate,
+            position=self.position,
+            session=self.session,
+            vote_signature=AnonymousElectionVote.create_vote_signature(voter_hash, candidate.id, voted_at.isoformat()),
+            voted_at=voted_at,
+            ip_hash='ip',
+        )
+
+    def logged_votes(self):
+        return list(AnonymousElectionVote.objects.filter(log_index__isnull=False).order_by('log_index'))
+
+    def test_every_vote_is_logged_once_in_order(self):
+        votes = self.logged_votes()
+        self.assertEqual([vote.log_index for vote in votes], list(range(11)))
+        self.assertEqual([vote.id for vote in votes], sorted(vote.id for vote in votes))
+
+    def test_checkpoints_are_consistent(self):
+        """Every published root is the tree hash of a prefix of today's log, so the log only grew"""
+        leaves = [vote_log.vote_leaf_hash(vote) for vote in self.logged_votes()]
+        checkpoints = list(VoteLogCheckpoint.objects.order_by('tree_size'))
+        self.assertEqual([checkpoint.tree_size for checkpoint in checkpoints], [4, 8, 11])
+        for checkpoint in checkpoints:
+            self.assertEqual(checkpoint.root_hash, reference_root(leaves[:checkpoint.tree_size]))
+
+    def test_streaming_tree_hash_matches_reference(self):
+        leaves = [hashlib.sha256(bytes([i])).hexdigest() for i in range(20)]
+        tree = vote_log.StreamingTreeHash()
+        self.assertEqual(tree.root(), reference_root([]))
+        for size, leaf in enumerate(leaves, start=1):
+            tree.add(leaf)
+            self.assertEqual(tree.root(), reference_root(leaves[:size]))
+
+    def test_inclusion_proofs_lead_to_the_published_root(self):
+        checkpoint = vote_log.latest_checkpoint()
+        for vote in self.logged_votes():
+            proof = vote_log.get_inclusion_proof(vote)
+            self.assertEqual(proof['log_index'], vote.log_index)
+            self.assertEqual(proof['tree_size'], 11)
+            self.assertEqual(proof['root_hash'], checkpoint.root_hash)
+            self.assertEqual(proof['leaf_hash'], vote_log.vote_leaf_hash(vote))
+            self.assertEqual(vote_log.root_from_proof(proof['leaf_hash'], proof['path']), checkpoint.root_hash)
+
+    def test_inclusion_proof_fails_for_another_leaf(self):
+        first, second = self.logged_votes()[:2]
+        proof = vote_log.get_inclusion_proof(first)
+        self.assertNotEqual(
+            vote_log.root_from_proof(vote_log.vote_leaf_hash(second), proof['path']), proof['root_hash']
+        )
+
+    def test_unlogged_vote_has_no_proof(self):
+        self.assertIsNone(vote_log.get_inclusion_proof(self.cast(99)))
+
+    def test_proofs_follow_later_appends(self):
+        vote = self.logged_votes()[10]
+        self.cast(99)
+        vote_log.append_all_pending_votes()
+        proof = vote_log.get_inclusion_proof(vote)
+        self.assertEqual(proof['tree_size'], 12)
+        self.assertEqual(vote_log.root_from_proof(proof['leaf_hash'], proof['path']), proof['root_hash'])
+
+    def test_verify_vote_log_fails_on_a_changed_vote(self):
+        call_command('verify_vote_log', stdout=StringIO())
+
+        vote = self.logged_votes()[5]
+        other = self.candidates[1] if vote.candidate_id == self.candidates[0].id else self.candidates[0]
+        AnonymousElectionVote.objects.filter(pk=vote.pk).update(candidate=other)
+        with self.assertRaisesMessage(CommandError, 'Root mismatch'):
+            call_command('verify_vote_log', stdout=StringIO())
+
+# ========== HUEL RATING SUMS ==========
+
+class HuelRatingSumsTests(TestCase):
+
+    def setUp(self):
+        department = Department.objects.create(name='Humanities', short_name='HSS')
+        self.huel = Huel.objects.create(
+            code='HSS F222', name='Linguistics', department=department, instructor='A Kumar'
+        )
+        self.users = [User.objects.create_user(username=f'rater{i}') for i in range(3)]
+
+    def rate(self, user, grading, toughness, overall):
+        return HuelRating.objects.create(
+            user=user, huel=self.huel, grading=grading, toughness=toughness, overall=overall
+        )
+
+    def assertAggregates(self, count, grading, toughness, overall):
+        self.huel.refresh_from_db()
+        self.assertEqual(self.huel.rating_count, count)
+        self.assertAlmostEqual(self.huel.avg_grading, grading)
+        self.assertAlmostEqual(self.huel.avg_toughness, toughness)
+        self.assertAlmostEqual(self.huel.avg_overall, overall)
+        self.assertAlmostEqual(self.huel.combined_score, Huel.combine_averages(grading, toughness, overall))
+
+    def test_new_ratings_are_added(self):
+        self.rate(self.users[0], 4, 2, 5)
+        self.assertAggregates(1, 4, 2, 5)
+        self.rate(self.users[1], 2, 3, 3)
+        self.assertAggregates(2, 3, 2.5, 4)
+
+    def test_changed_rating_replaces_its_old_values(self):
+        rating = self.rate(self.users[0], 4, 2, 5)
+        self.rate(self.users[1], 2, 3, 3)
+
+        rating.grading, rating.overall = 1, 1
+        rating.save()
+        self.assertAggregates(2, 1.5, 2.5, 2)
+
+        # The rate endpoint saves through update_or_create on a freshly loaded row
+        HuelRating.objects.update_or_create(
+            user=self.users[1], huel=self.huel, defaults={'grading': 5, 'toughness': 5, 'overall': 5}
+        )
+        self.assertAggregates(2, 3, 3.5, 3)
+
+    def test_change_of_a_partially_loaded_rating(self):
+        self.rate(self.users[0], 4, 2, 5)
+        rating = HuelRating.objects.only('id', 'huel', 'overall').get(user=self.users[0])
+        rating.grading, rating.toughness, rating.overall = 2, 2, 2
+        rating.save()
+        self.assertAggregates(1, 2, 2, 2)
+
+    def test_deleted_ratings_are_removed(self):
+        first = self.rate(self.users[0], 4, 2, 5)
+        self.rate(self.users[1], 2, 3, 3)
+        self.rate(self.users[2], 3, 4, 1)
+
+        first.delete()
+        self.assertAggregates(2, 2.5, 3.5, 2)
+
+        HuelRating.objects.filter(huel=self.huel).delete()
+        self.assertAggregates(0, 0, 0, 0)
+
+    def test_rebuild_finds_no_drift_after_updates(self):
+        rating = self.rate(self.users[0], 4, 2, 5)
+        self.rate(self.users[1], 2, 3, 3)
+        rating.toughness = 4
+        rating.save()
+        self.assertEqual(Huel.rebuild_ratings(), [])
+
+# ========== KEYSET PAGINATION ==========
+
+class KeysetPaginationTests(TestCase):
+    OVERALL = [4, 4, 4, 3, 3, 5, 4]  # Ties, so pages break inside runs of equal values
+
+    def setUp(self):
+        self.department = Department.objects.create(name='Humanities', short_name='HSS')
+        for number, overall in enumerate(self.OVERALL):
+            self.create_huel(number, overall)
+        self.factory = RequestFactory()
+
+    def create_huel(self, number, overall):
+        return Huel.objects.create(
+            code=f'HSS F{number:03d}', name='Course', department=self.department,
+            instructor='A Kumar', avg_overall=overall
+        )
+
+    def page(self, cursor=None, limit=2, descending=True, sort='overall'):
+        params = {'limit': limit}
+        if cursor:
+            params['cursor'] = cursor
+        return pagination.paginate(Huel.objects.all(), self.factory.get('/', params), sort, 'avg_overall', descending)
+
+    def walk(self, limit, descending, cursor=None, ids=()):
+        """Ids of every page from cursor on; fails instead of looping on a cursor that doesn't advance"""
+        ids = list(ids)
+        for _ in range(len(self.OVERALL) + 2):
+            rows, cursor = self.page(cursor, limit, descending)
+            ids += [row.id for row in rows]
+            if cursor is None:
+                return ids
+        self.fail('Pagination did not reach the last page')
+
+    def expected(self, descending):
+        return list(Huel.objects.order_by(*pagination.ordering('avg_overall', descending)).values_list('id', flat=True))
+
+    def test_every_page_size_walks_the_list_once_in_order(self):
+        for descending in (True, False):
+            for limit in range(1, len(self.OVERALL) + 2):
+                with self.subTest(limit=limit, descending=descending):
+                    self.assertEqual(self.walk(limit, descending), self.expected(descending))
+
+    def test_exactly_full_last_page_has_no_cursor(self):
+        rows, cursor = self.page(limit=len(self.OVERALL))
+        self.assertEqual(len(rows), len(self.OVERALL))
+        self.assertIsNone(cursor)
+
+        rows, cursor = self.page(limit=len(self.OVERALL) - 1)
+        rows, cursor = self.page(cursor, limit=len(self.OVERALL) - 1)
+        self.assertEqual(len(rows), 1)
+        self.assertIsNone(cursor)
+
+    def test_rows_added_before_the_cursor_are_not_repeated(self):
+        expected = self.expected(True)
+        rows, cursor = self.page(limit=3)  # The 5 and two of the 4s
+        self.create_huel(50, 5)  # Sorts first, so before the cursor
+        self.assertEqual(self.walk(3, True, cursor, [row.id for row in rows]), expected)
+
+    def test_cursor_of_another_sort_is_rejected(self):
+        _, cursor = self.page()
+        with self.assertRaises(pagination.InvalidCursor):
+            self.page(cursor, sort='grading')
+
+    def test_malformed_cursors_are_rejected(self):
+        wrong_shape = base64.urlsafe_b64encode(json.dumps(['overall', 'high', 'x']).encode()).decode()
+        for cursor in ('not a cursor', base64.urlsafe_b64encode(b'[1, 2]').decode(), wrong_shape):
+            with self.subTest(cursor=cursor), self.assertRaises(pagination.InvalidCursor):
+                self.page(cursor)
+
+    @override_settings(LIST_MAX_PAGE_SIZE=3)
+    def test_limit_is_capped(self):
+        rows, cursor = self.page(limit=1000)
+        self.assertEqual(len(rows), 3)
+        self.assertIsNotNone(cursor)
+
+# ========== IDEMPOTENCY ==========
+
+class IdempotencyTests(TestCase):
+    RATE_URL = '/api/main/huels/rate/'
+    VOTE_URL = '/api/main/elections/cast-anonymous-vote/'
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            VotingSession.objects.create(name='SU', voting_type='su_election', is_active=True)
+            position = ElectionPosition.objects.create(name='President')
+        self.candidate = ElectionCandidate.objects.create(name='A', position=position, manifesto='m')
+        department = Department.objects.create(name='Humanities', short_name='HSS')
+        self.huel = Huel.objects.create(code='HSS F222', name='Linguistics', department=department, instructor='A Kumar')
+        self.users = [User.objects.create_user(username=f'voter{i}') for i in range(2)]
+        for user in self.users:
+            UserProfile.objects.create(user=user)
+
+    def post(self, url, data, key, user=None):
+        client = APIClient()
+        client.force_authenticate(user or self.users[0])
+        return client.post(url, data, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def rating(self, overall=4):
+        return {'huel_id': self.huel.id, 'grading': 3, 'toughness': 2, 'overall': overall}
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post(self.RATE_URL, self.rating(), 'key-1')
+        retry = self.post(self.RATE_URL, self.rating(), 'key-1')
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', first)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(HuelRating.objects.count(), 1)
+
+    def test_same_key_with_another_body_is_422(self):
+        self.post(self.RATE_URL, self.rating(), 'key-1')
+        response = self.post(self.RATE_URL, self.rating(overall=1), 'key-1')
+        self.assertEqual(response.status_code, 422)
+        self.assertIn('error', response.json())
+        self.huel.refresh_from_db()
+        self.assertEqual(self.huel.avg_overall, 4)
+
+    def test_keys_are_per_user(self):
+        self.post(self.RATE_URL, self.rating(), 'key-1')
+        response = self.post(self.RATE_URL, self.rating(overall=1), 'key-1', user=self.users[1])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', response)
+        self.assertEqual(HuelRating.objects.count(), 2)
+
+    def test_overlong_key_is_rejected(self):
+        response = self.post(self.RATE_URL, self.rating(), 'k' * 256)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(HuelRating.objects.count(), 0)
+
+    def test_vote_replay_keeps_no_receipt(self):
+        first = self.post(self.VOTE_URL, {'candidate_id': self.candidate.id}, 'vote-1')
+        retry = self.post(self.VOTE_URL, {'candidate_id': self.candidate.id}, 'vote-1')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('verification', first.json())
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertNotIn('verification', retry.json())
+        self.assertNotIn('voter_id', retry.json())
+        self.assertEqual(AnonymousElectionVote.objects.count(), 1)
+
+    def test_vote_with_another_body_is_422(self):
+        other = ElectionCandidate.objects.create(name='B', position=self.candidate.position, manifesto='m')
+        self.post(self.VOTE_URL, {'candidate_id': self.candidate.id}, 'vote-1')
+        response = self.post(self.VOTE_URL, {'candidate_id': other.id}, 'vote-1')
+        self.assertEqual(response.status_code, 422)
+
+    def test_failed_vote_is_not_kept(self):
+        failed = self.post(self.VOTE_URL, {}, 'vote-1')
+        retry = self.post(self.VOTE_URL, {'candidate_id': self.candidate.id}, 'vote-1')
+        self.assertEqual(failed.status_code, 400)
+        self.assertEqual(retry.status_code, 200)
+        self.assertNotIn('Idempotent-Replayed', retry)
+        self.assertEqual(AnonymousElectionVote.objects.count(), 1)
+
+
+# ========== STREAMING ==========
+
+class StubBroadcaster(streaming_views.PollingBroadcaster):
+    """Broadcaster whose refresh fails with `error` or blocks until `release` is set"""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+        self.release = asyncio.Event()
+
+    def poll_delay(self):
+        return 0
+
+    async def _refresh(self):
+        if self.error is not None:
+            raise self.error
+        await self.release.wait()
+
+
+class PollingBroadcasterTests(SimpleTestCase):
+    STREAM_URL = '/api/main/elections/live-stream/'
+    LONG_POLL_URL = '/api/main/voting/long-poll/'
+
+    async def assertFails(self, awaitable, exception):
+        # Not assertRaises(): clearing the traceback's coroutine frames breaks tasks still using them
+        result, = await asyncio.gather(awaitable, return_exceptions=True)
+        self.assertIsInstance(result, exception)
+
+    async def assertProducerStops(self, broadcaster):
+        await asyncio.wait_for(broadcaster._task, 1)
+        self.assertEqual(broadcaster._subscribers, 0)
+
+    async def test_failed_refresh_releases_the_subscriber(self):
+        broadcaster = StubBroadcaster(RuntimeError('cache down'))
+        await self.assertFails(broadcaster.subscribe(), RuntimeError)
+        await self.assertProducerStops(broadcaster)
+
+    async def test_cancelled_subscribe_releases_the_subscriber(self):
+        broadcaster = StubBroadcaster()
+        subscribing = asyncio.create_task(broadcaster.subscribe())
+        await asyncio.sleep(0)
+        subscribing.cancel()
+        await self.assertFails(subscribing, asyncio.CancelledError)
+        await self.assertProducerStops(broadcaster)
+
+    async def test_live_stream_releases_a_failed_subscriber(self):
+        broadcaster = StubBroadcaster(RuntimeError('cache down'))
+        with mock.patch.object(streaming_views, '_results_broadcaster', broadcaster):
+            response = await AsyncClient().get(self.STREAM_URL)
+            await self.assertFails(anext(response.streaming_content), RuntimeError)
+        await self.assertProducerStops(broadcaster)
+
+    async def test_live_stream_releases_a_client_that_left_while_subscribing(self):
+        broadcaster = StubBroadcaster()
+        with mock.patch.object(streaming_views, '_results_broadcaster', broadcaster):
+            response = await AsyncClient().get(self.STREAM_URL)
+            reading = asyncio.create_task(anext(response.streaming_content))
+            await asyncio.sleep(0)
+            reading.cancel()
+            await self.assertFails(reading, asyncio.CancelledError)
+        await self.assertProducerStops(broadcaster)
+
+    async def test_long_poll_releases_a_failed_subscriber(self):
+        watcher = StubBroadcaster(RuntimeError('cache down'))
+        with mock.patch.object(streaming_views, '_voting_status_watcher', watcher):
+            await self.assertFails(AsyncClient().get(self.LONG_POLL_URL), RuntimeError)
+        await self.assertProducerStops(watcher)
+
+    async def test_long_poll_releases_a_client_that_left_while_subscribing(self):
+        watcher = StubBroadcaster()
+        with mock.patch.object(streaming_views, '_voting_status_watcher', watcher):
+            request = AsyncRequestFactory().get(self.LONG_POLL_URL)
+            polling = asyncio.create_task(streaming_views.voting_status_long_poll(request))
+            while watcher._subscribers == 0:
+                await asyncio.sleep(0)
+            polling.cancel()
+            await self.assertFails(polling, asyncio.CancelledError)
+        await self.assertProducerStops(watcher)
+
+    async def test_long_poll_returns_the_unchanged_status_on_timeout(self):
+        watcher = StubBroadcaster()
+        watcher.statuses = {'su_election': {'status': 'active'}}
+        watcher.release.set()
+        version = voting_control_views.status_version(watcher.statuses)
+        with mock.patch.object(streaming_views, '_voting_status_watcher', watcher):
+            response = await AsyncClient().get(self.LONG_POLL_URL, {'version': version, 'timeout': 0})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'statuses': watcher.statuses, 'version': version})
+        await self.assertProducerStops(watcher)
+
+
+# ========== THROTTLING ==========
+
+THROTTLE_RATES = {'read': '3/s', 'write': '2/s', 'login': '2/s', 'github': '2/s'}
+THROTTLED_REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': THROTTLE_RATES}
+
+@api_view(['GET', 'POST'])
+def throttled_view(request):
+    return Response({})
+
+
+class TokenBucketTestsMixin:
+    """Bucket behaviour shared by the Redis and local memory implementations"""
+
+    def setUp(self):
+        cache.clear()
+
+    def take(self, throttle_class=throttling.ReadWriteThrottle, method='post', user_id=None):
+        """(allowed, seconds to wait) for one request"""
+        request = Request(getattr(APIRequestFactory(), method)('/api/main/throttled/'))
+        if user_id is not None:
+            request.user = User(pk=user_id)
+        throttle = throttle_class()
+        return throttle.allow_request(request, None), throttle.wait()
+
+    def test_burst_up_to_the_rate_then_wait(self):
+        self.assertEqual([self.take()[0] for _ in range(2)], [True, True])
+        allowed, wait = self.take()
+        self.assertFalse(allowed)
+        self.assertTrue(0 < wait <= 0.5)
+
+    def test_bucket_refills_over_time(self):
+        for _ in range(2):
+            self.take()
+        self.assertFalse(self.take()[0])
+        self.refill(0.6)  # One token at 2/s
+        self.assertTrue(self.take()[0])
+        self.assertFalse(self.take()[0])
+
+    def test_scopes_have_separate_buckets(self):
+        for _ in range(2):
+            self.take()
+        self.assertFalse(self.take()[0])
+        self.assertTrue(self.take(method='get')[0])
+        self.assertTrue(self.take(throttling.LoginThrottle)[0])
+        self.assertTrue(self.take(throttling.GitHubThrottle)[0])
+        self.assertTrue(self.take(user_id=1)[0])
+
+    def test_over_limit_request_is_429_with_retry_after(self):
+        factory = APIRequestFactory()
+        responses = [throttled_view(factory.post('/api/main/throttled/')) for _ in range(3)]
+        self.assertEqual([response.status_code for response in responses], [200, 200, 429])
+        self.assertEqual(responses[2]['Retry-After'], '1')
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    REST_FRAMEWORK=THROTTLED_REST_FRAMEWORK,
+)
+class LocalTokenBucketTests(TokenBucketTestsMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.now = time.time()
+        clock = mock.patch('time.time', lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def refill(self, seconds):
+        self.now += seconds
+
+
+@skipUnless(settings.REDIS_URL, 'needs Redis (REDIS_URL)')
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': settings.REDIS_URL}},
+    REST_FRAMEWORK=THROTTLED_REST_FRAMEWORK,
+)
+class RedisTokenBucketTests(TokenBucketTestsMixin, SimpleTestCase):
+    """Runs the Lua script, which reads Redis' own clock"""
+
+    def refill(self, seconds):
+        time.sleep(seconds)
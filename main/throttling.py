@@ -0,0 +1,140 @@
+"""
+Token-bucket request throttling.
+
+Each client gets a bucket per scope that holds up to N tokens and refills at
+N per period, so short bursts are allowed while the sustained rate is capped.
+Buckets are keyed by user id, or by the hashed client IP for anonymous
+requests, and live in the shared cache so every gunicorn worker sees the same
+budget. Rates use DRF's "N/period" format in REST_FRAMEWORK's
+DEFAULT_THROTTLE_RATES. Over-limit requests get a 429 with Retry-After before
+the view runs.
+
+On the Redis cache a bucket is a hash updated by one Lua script, so the check
+and the spend are a single atomic round trip on Redis' clock. The local memory
+cache used without Redis is per process and updated under a lock.
+"""
+import threading
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .models import AnonymousElectionVote
+
+# KEYS[1] bucket; ARGV capacity, tokens per second, expiry seconds.
+# Returns nil when a token was taken, otherwise the seconds until one is available.
+TAKE_TOKEN = """
+local capacity, rate, ttl = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+if tokens < 1 then
+    return tostring((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], ttl)
+return nil
+"""
+
+_local_lock = threading.Lock()
+_take_token_script = None
+
+def _redis_client(backend, key):
+    """
+    The redis-py client a RedisCache writes `key` with.
+    RedisCache has no public accessor for it, so this relies on the private
+    _cache.get_client() of Django 5.1; check it when upgrading Django.
+    """
+    return backend._cache.get_client(key, write=True)
+
+class TokenBucketThrottle(BaseThrottle):
+    """Base class; subclasses pick the scope with get_scope()"""
+    cache_alias = DEFAULT_CACHE_ALIAS
+    scope = None
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_rate(self, scope):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+    def parse_rate(self, rate):
+        """'300/min' -> (300, 60)"""
+        num, period = rate.split('/')
+        return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+    def get_cache_key(self, request, scope):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{AnonymousElectionVote.hash_ip(self.get_ident(request))}'
+        return f'throttle:{scope}:{ident}'
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(request, view)
+        rate = self.get_rate(scope)
+        if rate is None:
+            return True
+
+        capacity, period = self.parse_rate(rate)
+        key = self.get_cache_key(request, scope)
+        # An idle bucket is full again after one period, so it can expire then
+        backend = caches[self.cache_alias]
+        if isinstance(backend, RedisCache):
+            wait = self._take_token_redis(backend, key, capacity, period)
+        else:
+            wait = self._take_token_local(backend, key, capacity, period)
+        if wait is None:
+            return True
+        self.wait_seconds = wait
+        return False
+
+    def _take_token_redis(self, backend, key, capacity, period):
+        global _take_token_script
+        key = backend.make_and_validate_key(key)
+        client = _redis_client(backend, key)
+        if _take_token_script is None:
+            _take_token_script = client.register_script(TAKE_TOKEN)
+        wait = _take_token_script(keys=[key], args=[capacity, capacity / period, period], client=client)
+        return None if wait is None else float(wait)
+
+    def _take_token_local(self, backend, key, capacity, period):
+        refill_per_second = capacity / period
+        with _local_lock:
+            now = time.time()
+            tokens, updated_at = backend.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            if tokens < 1:
+                return (1 - tokens) / refill_per_second
+            backend.set(key, (tokens - 1, now), period)
+        return None
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)
+
+
+class ReadWriteThrottle(TokenBucketThrottle):
+    """Default throttle: separate budgets for safe (read) and unsafe (write) methods"""
+
+    def get_scope(self, request, view):
+        if request.method in ('GET', 'HEAD', 'OPTIONS'):
+            return 'read'
+        return 'write'
+
+
+class LoginThrottle(TokenBucketThrottle):
+    """
+    Sign-in and token endpoints. Their requests are anonymous, so the write budget
+    per hashed IP would be shared by everyone behind a campus NAT
+    """
+    scope = 'login'
+
+
+class GitHubThrottle(TokenBucketThrottle):
+    """Contributor endpoints that call the GitHub API"""
+    scope = 'github'
@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views
 from . import voting_control_views
+from . import streaming_views
 
 urlpatterns = [
     # ========== AUTHENTICATION ==========
@@ -13,12 +14,17 @@ urlpatterns = [
     path('elections/candidates/', views.election_candidates, name='election_candidates'),
     path('elections/candidates-by-position/', views.candidates_by_position, name='candidates_by_position'),
     path('elections/live-stats/', views.election_live_stats, name='election_live_stats'),
+    path('elections/live-stream/', streaming_views.election_live_stream, name='election_live_stream'),
     path('elections/cast-anonymous-vote/', views.cast_anonymous_election_vote, name='cast_anonymous_election_vote'),
+    path('elections/cast-ballot/', views.cast_ballot, name='cast_ballot'),
     path('elections/check-vote-status/', views.check_anonymous_vote_status, name='check_anonymous_vote_status'),
+    path('elections/vote-log/root/', views.vote_log_root, name='vote_log_root'),
+    path('elections/vote-log/proof/', views.vote_log_proof, name='vote_log_proof'),
     
     # ========== HUELS (COURSES) ==========
     path('huels/departments/', views.departments, name='departments'),
     path('huels/', views.huels, name='huels'),
+    path('huels/suggest/', views.suggest_huels, name='suggest_huels'),
     path('huels/<int:huel_id>/', views.huel_detail, name='huel_detail'),
     path('huels/rate/', views.rate_huel, name='rate_huel'),
     path('huels/comment/', views.comment_huel, name='comment_huel'),
@@ -31,6 +37,8 @@ urlpatterns = [
     # ========== VOTING CONTROL ==========
     path('voting/status/<str:voting_type>/', voting_control_views.get_voting_status, name='get_voting_status'),
     path('voting/status/', voting_control_views.get_all_voting_statuses, name='get_all_voting_statuses'),
+    path('voting/long-poll/<str:voting_type>/', streaming_views.voting_status_long_poll, name='voting_status_long_poll'),
+    path('voting/long-poll/', streaming_views.voting_status_long_poll, name='all_voting_statuses_long_poll'),
     
     # ========== STATISTICS ==========
     path('stats/', views.voting_stats, name='voting_stats'),
@@ -1,14 +1,16 @@
 import json
 import requests
 from django.conf import settings
-from django.db.models import Q, Sum, Avg, Count
+from django.db.models import Q, Sum, Avg, Count, Prefetch, OuterRef, Subquery, Case, When
+from django.db.models.functions import Coalesce
 from django.http import JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.db import transaction
@@ -16,11 +18,22 @@ from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 
 from .models import (
-    VotingSession, ElectionPosition, ElectionCandidate, AnonymousElectionVote,
+    ElectionPosition, ElectionCandidate, ElectionCandidateTally,
+    AnonymousElectionVote, StagedElectionVote,
     Department, Huel, HuelRating, HuelComment,
     DepartmentClub, DepartmentClubVote, DepartmentClubComment,
     UserProfile
 )
+from . import live_results
+from . import pagination
+from . import vote_log
+from . import final_results
+from . import huel_search
+from . import huel_suggest
+from . import position_registry
+from . import session_cache
+from .idempotency import idempotent
+from .throttling import GitHubThrottle, LoginThrottle
 from .serializers import (
     UserSerializer, UserProfileSerializer,
     ElectionPositionSerializer, ElectionCandidateSerializer, AnonymousElectionVoteSerializer,
@@ -48,10 +61,94 @@ def get_or_create_user_profile(user, google_data=None):
     )
     return profile
 
+def get_client_ip(request):
+    """
+    Client IP as seen by nginx, used only in hashed form. Earlier X-Forwarded-For
+    entries are client-supplied, so this takes the one REST_FRAMEWORK's NUM_PROXIES
+    points at (the address nginx appended), the same one the throttles key on.
+    """
+    return BaseThrottle().get_ident(request)
+
+def election_candidate_context(candidates, request=None):
+    """
+    Precomputed ElectionCandidateSerializer context so serializing a list costs no
+    per-candidate queries: live counts and per-position totals come from the merged
+    tally view, and the positions the user has voted for from their profile.
+    """
+    tally = ElectionCandidateTally.merged_view()
+    context = {
+        'vote_counts': tally['candidates'],
+        'position_totals': tally['positions'],
+    }
+    if request is not None:
+        context['request'] = request
+        context['voted_position_ids'] = voted_position_ids(request.user)
+    return context
+
+def voted_position_ids(user):
+    """Positions the user has voted for in the current SU election, from the profile loaded with the user"""
+    session = session_cache.current('su_election')
+    profile = getattr(user, 'profile', None) if user.is_authenticated else None
+    if session is None or profile is None:
+        return set()
+    return profile.voted_position_ids(session.id)
+
+def voting_closed_response(session):
+    """403 with the session's status message while it isn't accepting votes, else None"""
+    if session is None or session.is_voting_allowed():
+        return None
+    status_info, message = session.get_current_status()
+    return Response({"error": message, "status": status_info}, status=403)
+
+def record_votes(votes):
+    """
+    Record unsaved AnonymousElectionVote instances inside the caller's transaction.
+    In the queued ingestion mode the votes only go to the staging table and the
+    drainer applies them later; otherwise they are inserted and counted right away.
+    Returns the votes that were accepted; the rest were already cast.
+    """
+    if settings.VOTE_INGESTION_MODE == 'queued':
+        return StagedElectionVote.stage_if_absent(votes)
+
+    inserted, transaction_id = AnonymousElectionVote.insert_if_absent(votes)
+    for vote in inserted:
+        # Update candidate vote count on one of its tally stripes
+        ElectionCandidateTally.increment(vote.candidate_id)
+    live_results.record_votes(inserted, transaction_id)
+    return inserted
+
+def final_results_response(data):
+    """Response for frozen election results, which clients and nginx may cache"""
+    response = Response(data)
+    response['Cache-Control'] = f'public, max-age={settings.FINAL_RESULTS_CACHE_SECONDS}'
+    return response
+
+# Profile flags still kept for the positions the frontend knows by name, by slug
+LEGACY_VOTED_FLAGS = {
+    'president': 'voted_president',
+    'general-secretary': 'voted_gen_sec',
+}
+
+def mark_positions_voted(user, positions, session):
+    """
+    Record the positions the user has voted for in the session on their profile
+    with a single UPDATE, inside the caller's vote transaction.
+    """
+    flags = {
+        LEGACY_VOTED_FLAGS[position.slug]: True
+        for position in positions if position.slug in LEGACY_VOTED_FLAGS
+    }
+
+    position_ids = [position.id for position in positions]
+    if not UserProfile.mark_voted(user.id, session.id, position_ids, **flags):
+        get_or_create_user_profile(user)
+        UserProfile.mark_voted(user.id, session.id, position_ids, **flags)
+
 # ========== AUTHENTICATION VIEWS ==========
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def google_login(request):
     """
     Authenticates a user with a Google ID token. If the user doesn't exist,
@@ -160,91 +257,175 @@ def election_candidates(request):
     if position_id:
         candidates = candidates.filter(position_id=position_id)
     
-    candidates = candidates.select_related('position').order_by('-vote_count')
-    serializer = ElectionCandidateSerializer(candidates, many=True, context={'request': request})
+    candidates = list(candidates.select_related('position'))
+    context = election_candidate_context(candidates, request)
+    candidates.sort(key=lambda candidate: context['vote_counts'].get(candidate.id, 0), reverse=True)
+    serializer = ElectionCandidateSerializer(candidates, many=True, context=context)
     return Response(serializer.data)
 
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent('election-vote', replay_body=False)
 def cast_anonymous_election_vote(request):
     """Cast an anonymous vote for an election candidate"""
 
     try:
+        candidate_id = request.data.get('candidate_id')
+        if not candidate_id:
+            return Response({"error": "candidate_id is required"}, status=400)
+
+        candidate = get_object_or_404(
+            ElectionCandidate.objects.select_related('position'), id=candidate_id, is_active=True
+        )
+        position = candidate.position
+        session = session_cache.for_votes('su_election')
+        closed = voting_closed_response(session)
+        if closed is not None:
+            return closed
+
+        # Create anonymous voter hash
+        voter_hash = AnonymousElectionVote.create_voter_hash(request.user.id, position.id)
+
+        # Create anonymous vote; voted_at is the signed timestamp so the signature can be re-verified
+        from django.utils import timezone
+        vote_time = timezone.now()
+
+        vote_signature = AnonymousElectionVote.create_vote_signature(
+            voter_hash,
+            candidate.id,
+            vote_time.isoformat()
+        )
+
+        anonymous_vote = AnonymousElectionVote(
+            voter_hash=voter_hash,
+            candidate=candidate,
+            position=position,
+            session=session,
+            vote_signature=vote_signature,
+            voted_at=vote_time,
+            ip_hash=AnonymousElectionVote.hash_ip(get_client_ip(request))
+        )
+
         with transaction.atomic():
-            candidate_id = request.data.get('candidate_id')
-            if not candidate_id:
-                return Response({"error": "candidate_id is required"}, status=400)
+            # The unique (voter_hash, position, session) constraint rejects a second vote in the
+            # same statement; a new voting session takes a fresh vote
+            if not record_votes([anonymous_vote]):
+                return Response({
+                    "error": f"You have already voted for {position.name}"
+                }, status=400)
 
-            candidate = get_object_or_404(ElectionCandidate, id=candidate_id, is_active=True)
-            
-            # Create anonymous voter hash
-            voter_hash = AnonymousElectionVote.create_voter_hash(
-                request.user.id, 
-                candidate.position.id
-            )
-            
-            # Check if this anonymous voter already voted for this position
-            existing_vote = AnonymousElectionVote.objects.filter(
-                voter_hash=voter_hash, 
-                position=candidate.position
-            ).first()
-            
-            if existing_vote:
+            # Update user profile voting status flags
+            mark_positions_voted(request.user, [position], session)
+
+        return Response({
+            "success": f"Anonymous vote cast successfully for {candidate.name}",
+            "vote_id": anonymous_vote.id,  # None while the vote waits in the ingestion queue
+            "queued": anonymous_vote.id is None,
+            "voter_id": voter_hash[:8],  # Only first 8 chars for identification
+            "verification": {
+                "signature": vote_signature,
+                "timestamp": vote_time.isoformat()
+            }
+        })
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@idempotent('election-ballot', replay_body=False)
+def cast_ballot(request):
+    """
+    Cast anonymous votes for several positions at once.
+    Body: {"selections": [{"position": <id>, "candidate": <id>}, ...]}
+    Either every vote is recorded or none is.
+    """
+    try:
+        selections = request.data.get('selections')
+        if not isinstance(selections, list) or not selections:
+            return Response({"error": "selections must be a non-empty list"}, status=400)
+
+        session = session_cache.for_votes('su_election')
+        closed = voting_closed_response(session)
+        if closed is not None:
+            return closed
+
+        try:
+            selections = [
+                (int(selection['position']), int(selection['candidate']))
+                for selection in selections
+            ]
+        except (KeyError, TypeError, ValueError):
+            return Response({"error": "Each selection needs a position and a candidate id"}, status=400)
+
+        position_ids = [position_id for position_id, _ in selections]
+        if len(set(position_ids)) != len(position_ids):
+            return Response({"error": "Only one candidate can be selected per position"}, status=400)
+
+        # Validate every selection against active candidates of active positions in one query
+        candidates = ElectionCandidate.objects.filter(
+            id__in=[candidate_id for _, candidate_id in selections],
+            is_active=True,
+            position__is_active=True
+        ).select_related('position').in_bulk()
+
+        for position_id, candidate_id in selections:
+            candidate = candidates.get(candidate_id)
+            if candidate is None or candidate.position_id != position_id:
                 return Response({
-                    "error": f"You have already voted for {candidate.position.name}"
+                    "error": f"Candidate {candidate_id} is not running for position {position_id}"
                 }, status=400)
 
-            # Get client IP for basic fraud prevention (hashed)
-            client_ip = request.META.get('HTTP_X_FORWARDED_FOR')
-            if client_ip:
-                client_ip = client_ip.split(',')[0].strip()
-            else:
-                client_ip = request.META.get('REMOTE_ADDR')
-            
-            ip_hash = AnonymousElectionVote.hash_ip(client_ip)
-            
-            # Create anonymous vote
-            from django.utils import timezone
-            vote_time = timezone.now()
-            
-            vote_signature = AnonymousElectionVote.create_vote_signature(
-                voter_hash,
-                candidate.id,
-                vote_time.isoformat()
-            )
-            
-            anonymous_vote = AnonymousElectionVote.objects.create(
+        from django.utils import timezone
+        vote_time = timezone.now()
+        ip_hash = AnonymousElectionVote.hash_ip(get_client_ip(request))
+
+        votes = []
+        for position_id, candidate_id in selections:
+            voter_hash = AnonymousElectionVote.create_voter_hash(request.user.id, position_id)
+            votes.append(AnonymousElectionVote(
                 voter_hash=voter_hash,
-                candidate=candidate,
-                position=candidate.position,
-                vote_signature=vote_signature,
+                candidate=candidates[candidate_id],
+                position=candidates[candidate_id].position,
+                session=session,
+                vote_signature=AnonymousElectionVote.create_vote_signature(
+                    voter_hash, candidate_id, vote_time.isoformat()
+                ),
+                voted_at=vote_time,
                 ip_hash=ip_hash
-            )
-            
-            # Update candidate vote count (using anonymous votes)
-            anonymous_vote_count = candidate.anonymous_votes.count()
-            candidate.vote_count = anonymous_vote_count
-            candidate.save()
-            
-            # Update user profile voting status flags
-            profile = get_or_create_user_profile(request.user)
-            if candidate.position.name.lower() == "president":
-                profile.voted_president = True
-            elif candidate.position.name.lower() in ["general secretary", "gensec"]:
-                profile.voted_gen_sec = True
-            profile.save()
+            ))
 
-            return Response({
-                "success": f"Anonymous vote cast successfully for {candidate.name}",
-                "vote_id": anonymous_vote.id,
-                "voter_id": voter_hash[:8],  # Only first 8 chars for identification
-                "verification": {
-                    "signature": vote_signature,
-                    "timestamp": vote_time.isoformat()
+        with transaction.atomic():
+            accepted = record_votes(votes)
+            if len(accepted) != len(votes):
+                transaction.set_rollback(True)
+                already_voted = [vote.position.name for vote in votes if vote not in accepted]
+                return Response({
+                    "error": f"You have already voted for {', '.join(already_voted)}"
+                }, status=400)
+
+            mark_positions_voted(request.user, [vote.position for vote in votes], session)
+
+        return Response({
+            "success": f"Anonymous ballot cast successfully for {len(votes)} position(s)",
+            "receipts": [
+                {
+                    "position": vote.position_id,
+                    "position_name": vote.position.name,
+                    "candidate": vote.candidate_id,
+                    "candidate_name": vote.candidate.name,
+                    "vote_id": vote.id,
+                    "queued": vote.id is None,
+                    "voter_id": vote.voter_hash[:8],  # Only first 8 chars for identification
+                    "verification": {
+                        "signature": vote.vote_signature,
+                        "timestamp": vote_time.isoformat()
+                    }
                 }
-            })
+                for vote in votes
+            ]
+        })
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
@@ -253,23 +434,17 @@ def cast_anonymous_election_vote(request):
 def check_anonymous_vote_status(request):
     """Check if user has voted anonymously for any positions"""
     try:
-        positions = ElectionPosition.objects.filter(is_active=True)
+        voted_ids = voted_position_ids(request.user)
+
         vote_status = {}
-        
-        for position in positions:
-            voter_hash = AnonymousElectionVote.create_voter_hash(
-                request.user.id, 
-                position.id
-            )
-            has_voted = AnonymousElectionVote.objects.filter(
-                voter_hash=voter_hash, 
-                position=position
-            ).exists()
-            
+        for position in position_registry.positions():
+            has_voted = position.id in voted_ids
             vote_status[position.id] = {
                 'position_name': position.name,
                 'has_voted': has_voted,
-                'voter_id': voter_hash[:8] if has_voted else None
+                'voter_id': AnonymousElectionVote.create_voter_hash(
+                    request.user.id, position.id
+                )[:8] if has_voted else None
             }
         
         return Response({
@@ -280,6 +455,52 @@ def check_anonymous_vote_status(request):
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
+# ========== VOTE LOG VIEWS ==========
+
+@api_view(["GET"])
+def vote_log_root(request):
+    """Latest published root of the Merkle vote log"""
+    try:
+        checkpoint = vote_log.latest_checkpoint()
+        if checkpoint is None:
+            return Response({"tree_size": 0, "root_hash": None, "published_at": None})
+
+        return Response({
+            "tree_size": checkpoint.tree_size,
+            "root_hash": checkpoint.root_hash,
+            "published_at": checkpoint.created_at
+        })
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
+@api_view(["GET"])
+def vote_log_proof(request):
+    """
+    Inclusion proof for a vote receipt.
+    Takes the verification signature returned when the vote was cast and returns
+    the leaf hash and the sibling hashes needed to recompute the published root.
+    """
+    try:
+        signature = request.GET.get('signature')
+        if not signature:
+            return Response({"error": "signature is required"}, status=400)
+
+        vote = AnonymousElectionVote.objects.filter(vote_signature=signature).only(
+            'voter_hash', 'candidate_id', 'position_id', 'vote_signature', 'log_index'
+        ).first()
+        if vote is None:
+            return Response({"error": "No vote found for this signature"}, status=404)
+
+        proof = vote_log.get_inclusion_proof(vote)
+        if proof is None:
+            return Response({
+                "error": "This vote has not been added to the vote log yet, try again shortly"
+            }, status=404)
+
+        return Response(proof)
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
 # ========== HUEL VIEWS ==========
 
 @api_view(["GET"])
@@ -289,52 +510,101 @@ def departments(request):
     serializer = DepartmentSerializer(departments, many=True)
     return Response(serializer.data)
 
+def huel_queryset():
+    """Active huels with everything HuelSerializer reads, in a fixed number of queries"""
+    return Huel.objects.filter(is_active=True).select_related('department').prefetch_related(
+        Prefetch('comments', queryset=HuelComment.objects.select_related('user'))
+    )
+
+def huel_serializer_context(huels, request=None):
+    """HuelSerializer context with the user's ratings of the given huels from one query"""
+    context = {'user_ratings': {}}
+    if request is not None:
+        context['request'] = request
+        if request.user.is_authenticated and huels:
+            context['user_ratings'] = {
+                rating.huel_id: rating
+                for rating in HuelRating.objects.filter(
+                    user=request.user, huel__in=[huel.id for huel in huels]
+                ).select_related('user')
+            }
+    return context
+
+# sort_by -> (column, descending); each column has a (column, id) index for pagination
+HUEL_SORTS = {
+    'overall': ('avg_overall', True),
+    'grading': ('avg_grading', True),
+    'toughness': ('avg_toughness', False),  # Lower toughness first
+    'upvotes': ('upvotes', True),
+    'relevance': ('search_rank', True),  # Only with ?search=
+}
+
 @api_view(["GET"])
 def huels(request):
-    """List huels with search and filter options"""
+    """
+    List huels with search and filter options, a page at a time: follow the
+    returned next cursor with ?cursor=, or pass ?all=1 for the whole list
+    """
     search = request.GET.get('search', '')
     department = request.GET.get('department')
-    sort_by = request.GET.get('sort_by', 'overall')  # overall, grading, toughness, upvotes
+    sort_by = request.GET.get('sort_by')  # overall, grading, toughness, upvotes, relevance
     
-    huels = Huel.objects.filter(is_active=True).select_related('department').prefetch_related('comments')
+    huels = huel_queryset()
     
     # Search filter
     if search:
-        huels = huels.filter(
-            Q(code__icontains=search) |
-            Q(name__icontains=search) |
-            Q(instructor__icontains=search)
-        )
+        huels = huel_search.search(huels, search)
     
     # Department filter
     if department:
         huels = huels.filter(department__short_name=department)
     
-    # Sorting
-    if sort_by == 'grading':
-        huels = huels.order_by('-avg_grading')
-    elif sort_by == 'toughness':
-        huels = huels.order_by('avg_toughness')  # Lower toughness first
-    elif sort_by == 'upvotes':
-        huels = huels.order_by('-upvotes')
-    else:  # overall
-        huels = huels.order_by('-avg_overall')
+    # Sorting; searches are ranked by relevance unless a sort is asked for
+    if search and sort_by is None:
+        sort_by = 'relevance'
+    if sort_by not in HUEL_SORTS or (sort_by == 'relevance' and not search):
+        sort_by = 'overall'
+    field, descending = HUEL_SORTS[sort_by]
     
-    serializer = HuelSerializer(huels, many=True, context={'request': request})
-    return Response(serializer.data)
+    if pagination.wants_all(request):
+        huels = list(huels.order_by(*pagination.ordering(field, descending)))
+        serializer = HuelSerializer(huels, many=True, context=huel_serializer_context(huels, request))
+        return Response(serializer.data)
+
+    try:
+        huels, next_cursor = pagination.paginate(huels, request, sort_by, field, descending)
+    except pagination.InvalidCursor as e:
+        return Response({"error": str(e)}, status=400)
+    serializer = HuelSerializer(huels, many=True, context=huel_serializer_context(huels, request))
+    return Response({'results': serializer.data, 'next': next_cursor})
+
+@api_view(["GET"])
+def suggest_huels(request):
+    """Typeahead: ids and labels of huels whose code, name or instructor starts with ?q="""
+    limit = settings.HUEL_SUGGEST_MAX_RESULTS
+    try:
+        limit = min(int(request.GET.get('limit', limit)), limit)
+    except ValueError:
+        pass
+    return Response(huel_suggest.suggest(request.GET.get('q', ''), limit))
 
 @api_view(["GET"])
 def huel_detail(request, huel_id):
     """Get detailed huel information"""
-    huel = get_object_or_404(Huel, id=huel_id, is_active=True)
-    serializer = HuelSerializer(huel, context={'request': request})
+    huel = get_object_or_404(huel_queryset(), id=huel_id)
+    serializer = HuelSerializer(huel, context=huel_serializer_context([huel], request))
     return Response(serializer.data)
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent('huel-rating')
 def rate_huel(request):
     """Rate a huel course"""
     try:
+        closed = voting_closed_response(session_cache.current('huel_voting'))
+        if closed is not None:
+            return closed
+
         huel_id = request.data.get('huel_id')
         grading = request.data.get('grading')
         toughness = request.data.get('toughness')
@@ -345,22 +615,26 @@ def rate_huel(request):
                 "error": "huel_id, grading, toughness, and overall ratings are required"
             }, status=400)
         
+        try:
+            values = {
+                'grading': float(grading),
+                'toughness': float(toughness),
+                'overall': float(overall)
+            }
+        except (TypeError, ValueError):
+            return Response({"error": "Ratings must be numbers"}, status=400)
+        if not all(1 <= value <= 5 for value in values.values()):
+            return Response({"error": "Ratings must be between 1 and 5"}, status=400)
+        
         huel = get_object_or_404(Huel, id=huel_id, is_active=True)
         
-        # Update or create rating
+        # Update or create rating; saving it applies the change to the huel's running sums
         rating, created = HuelRating.objects.update_or_create(
             user=request.user,
             huel=huel,
-            defaults={
-                'grading': float(grading),
-                'toughness': float(toughness),
-                'overall': float(overall)
-            }
+            defaults=values
         )
         
-        # Update huel aggregated ratings
-        huel.update_ratings()
-        
         action = "created" if created else "updated"
         return Response({
             "success": f"Rating {action} successfully",
@@ -402,14 +676,50 @@ def comment_huel(request):
 
 # ========== DEPARTMENT/CLUB VIEWS ==========
 
+def department_club_queryset():
+    """
+    Active departments and clubs annotated with their rank (1 + items of the same
+    type, and size when set, with more votes) and with their comments, in a
+    fixed number of queries
+    """
+    more_votes = DepartmentClub.objects.filter(
+        is_active=True, type=OuterRef('type'), vote_count__gt=OuterRef('vote_count')
+    ).order_by().values('type').annotate(count=Count('id')).values('count')
+    return DepartmentClub.objects.filter(is_active=True).annotate(
+        rank=Coalesce(
+            Case(
+                When(size='', then=Subquery(more_votes)),
+                default=Subquery(more_votes.filter(size=OuterRef('size'))),
+            ),
+            0,
+        ) + 1
+    ).prefetch_related(
+        Prefetch('comments', queryset=DepartmentClubComment.objects.select_related('user'))
+    )
+
+def department_club_serializer_context(items, request=None):
+    """DepartmentClubSerializer context with the ids of the given items the user voted for, from one query"""
+    context = {'voted_items': set()}
+    if request is not None:
+        context['request'] = request
+        if request.user.is_authenticated and items:
+            context['voted_items'] = set(DepartmentClubVote.objects.filter(
+                user=request.user, department_club__in=[item.id for item in items]
+            ).values_list('department_club_id', flat=True))
+    return context
+
 @api_view(["GET"])
 def department_clubs(request):
-    """List departments and clubs with filtering"""
+    """
+    List departments and clubs with filtering, most voted first and a page at a
+    time: follow the returned next cursor with ?cursor=, or pass ?all=1 for the
+    whole list
+    """
     club_type = request.GET.get('type')  # 'department' or 'club'
     category = request.GET.get('category')  # For filtering by category
     size = request.GET.get('size')  # For departments: 'major' or 'minor'
     
-    items = DepartmentClub.objects.filter(is_active=True).prefetch_related('comments')
+    items = department_club_queryset()
     
     if club_type:
         items = items.filter(type=club_type)
@@ -421,16 +731,28 @@ def department_clubs(request):
         items = items.filter(size=size)
     
     # Order by vote count (highest first)
-    items = items.order_by('-vote_count')
-    
-    serializer = DepartmentClubSerializer(items, many=True, context={'request': request})
-    return Response(serializer.data)
+    if pagination.wants_all(request):
+        items = list(items.order_by(*pagination.ordering('vote_count', True)))
+        serializer = DepartmentClubSerializer(items, many=True, context=department_club_serializer_context(items, request))
+        return Response(serializer.data)
+
+    try:
+        items, next_cursor = pagination.paginate(items, request, 'vote_count', 'vote_count', True)
+    except pagination.InvalidCursor as e:
+        return Response({"error": str(e)}, status=400)
+    serializer = DepartmentClubSerializer(items, many=True, context=department_club_serializer_context(items, request))
+    return Response({'results': serializer.data, 'next': next_cursor})
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent('department-club-vote')
 def vote_department_club(request):
     """Vote for a department or club"""
     try:
+        closed = voting_closed_response(session_cache.current('department_club'))
+        if closed is not None:
+            return closed
+
         item_id = request.data.get('item_id')
         if not item_id:
             return Response({"error": "item_id is required"}, status=400)
@@ -454,9 +776,10 @@ def vote_department_club(request):
             department_club=item
         )
         
+        item = department_club_queryset().get(id=item.id)
         return Response({
             "success": f"Vote cast successfully for {item.name}",
-            "item": DepartmentClubSerializer(item, context={'request': request}).data
+            "item": DepartmentClubSerializer(item, context={'request': request, 'voted_items': {item.id}}).data
         })
         
     except Exception as e:
@@ -503,7 +826,7 @@ def voting_stats(request):
             'huel_ratings': HuelRating.objects.count(),
             'department_club_votes': DepartmentClubVote.objects.count(),
             'total_comments': HuelComment.objects.count() + DepartmentClubComment.objects.count(),
-            'active_elections': ElectionPosition.objects.filter(is_active=True).count(),
+            'active_elections': len(position_registry.positions()),
             'active_huels': Huel.objects.filter(is_active=True).count(),
             'active_departments_clubs': DepartmentClub.objects.filter(is_active=True).count(),
         }
@@ -518,33 +841,49 @@ def voting_stats(request):
 def dashboard_stats(request):
     """Get dashboard statistics for admin"""
     try:
-        # Election stats
-        election_stats = {}
-        for position in ElectionPosition.objects.filter(is_active=True):
-            total_votes = position.candidates.aggregate(total=Sum('vote_count'))['total'] or 0
-            election_stats[position.name] = {
-                'total_votes': total_votes,
-                'candidates': position.candidates.filter(is_active=True).count()
-            }
+        # Election stats, frozen once the election is finalized and then kept in this worker
+        final_session = final_results.finalized_session()
+        if final_session is not None:
+            election_stats = final_results.get_payload(final_session, 'election_stats', final_results.election_stats)
+        else:
+            election_stats = {}
+            position_totals = ElectionCandidateTally.merged_view()['positions']
+            positions = position_registry.positions()
+            candidate_counts = dict(
+                ElectionCandidate.objects.filter(
+                    is_active=True, position_id__in=[position.id for position in positions]
+                ).values_list('position_id').annotate(count=Count('id'))
+            )
+            for position in positions:
+                election_stats[position.name] = {
+                    'total_votes': position_totals.get(position.id, 0),
+                    'candidates': candidate_counts.get(position.id, 0)
+                }
         
         # Top rated huels
-        top_huels = Huel.objects.filter(is_active=True).order_by('-avg_overall')[:5]
+        top_huels = huel_queryset().order_by('-avg_overall')[:5]
         
         # Top departments/clubs
-        top_departments = DepartmentClub.objects.filter(
-            type='department', is_active=True
-        ).order_by('-vote_count')[:5]
+        top_departments = department_club_queryset().filter(
+            type='department'
+        ).order_by('-vote_count', '-id')[:5]
         
-        top_clubs = DepartmentClub.objects.filter(
-            type='club', is_active=True
-        ).order_by('-vote_count')[:5]
+        top_clubs = department_club_queryset().filter(
+            type='club'
+        ).order_by('-vote_count', '-id')[:5]
         
-        return Response({
+        data = {
             'election_stats': election_stats,
-            'top_huels': HuelSerializer(top_huels, many=True).data,
-            'top_departments': DepartmentClubSerializer(top_departments, many=True).data,
-            'top_clubs': DepartmentClubSerializer(top_clubs, many=True).data,
-        })
+            'top_huels': HuelSerializer(top_huels, many=True, context=huel_serializer_context([])).data,
+            'top_departments': DepartmentClubSerializer(
+                top_departments, many=True, context=department_club_serializer_context([])
+            ).data,
+            'top_clubs': DepartmentClubSerializer(
+                top_clubs, many=True, context=department_club_serializer_context([])
+            ).data,
+        }
+        # Not final_results_response: only election_stats is frozen, the rest stays live
+        return Response(data)
         
     except Exception as e:
         return Response({"error": str(e)}, status=500)
@@ -553,88 +892,79 @@ def dashboard_stats(request):
 def candidates_by_position(request):
     """Get election candidates grouped by position"""
     try:
-        president_position = ElectionPosition.objects.filter(name="President", is_active=True).first()
-        gensec_position = ElectionPosition.objects.filter(name="General Secretary", is_active=True).first()
-        
-        president_candidates = []
-        gensec_candidates = []
-        
-        if president_position:
-            president_candidates = ElectionCandidate.objects.filter(
-                position=president_position, 
-                is_active=True
-            ).order_by('-vote_count')
-            
-        if gensec_position:
-            gensec_candidates = ElectionCandidate.objects.filter(
-                position=gensec_position, 
-                is_active=True
-            ).order_by('-vote_count')
-        
-        return Response({
-            'president': ElectionCandidateSerializer(president_candidates, many=True).data,
-            'gensec': ElectionCandidateSerializer(gensec_candidates, many=True).data
-        })
+        final_session = final_results.finalized_session()
+        if final_session is not None:
+            return final_results_response(
+                final_results.get_payload(final_session, 'candidates_by_position', final_candidates_by_position)
+            )
+
+        context = election_candidate_context([])
+        return Response(candidates_payload(
+            ElectionCandidate.objects.filter(
+                is_active=True, position_id__in=[position.id for position in position_registry.positions()]
+            ),
+            context
+        ))
         
     except Exception as e:
         return Response({"error": str(e)}, status=500)
 
+def candidates_payload(candidates, context):
+    """
+    Candidates grouped under their position's response key, most votes first,
+    from one query however many positions there are
+    """
+    vote_counts = context['vote_counts']
+    candidates = sorted(
+        candidates.select_related('position'),
+        key=lambda candidate: vote_counts.get(candidate.id, 0),
+        reverse=True
+    )
+
+    by_position = position_registry.empty_response(list)
+    for candidate in candidates:
+        by_position.setdefault(position_registry.response_key(candidate.position.slug), []).append(candidate)
+    return {
+        key: ElectionCandidateSerializer(position_candidates, many=True, context=context).data
+        for key, position_candidates in by_position.items()
+    }
+
+def final_candidates_by_position(session):
+    """candidates_by_position payload with the frozen counts of a finalized session"""
+    vote_counts, position_totals = final_results.vote_counts(session)
+    context = {'vote_counts': vote_counts, 'position_totals': position_totals}
+    return candidates_payload(ElectionCandidate.objects.filter(id__in=vote_counts), context)
+
 @api_view(["GET"])
 def election_live_stats(request):
-    """Get live election statistics"""
+    """
+    Get live election statistics.
+    Served from the incrementally maintained results snapshot; clients can send
+    If-None-Match with the previous ETag to get a 304 while nothing changed.
+    After the election is finalized the frozen final results are served instead.
+    """
     try:
-        president_position = ElectionPosition.objects.filter(name="President", is_active=True).first()
-        gensec_position = ElectionPosition.objects.filter(name="General Secretary", is_active=True).first()
-        
-        # Calculate total votes across all positions
-        total_all_votes = AnonymousElectionVote.objects.count()
-        
-        stats = {
-            'total_voters': User.objects.filter(is_active=True).count(),
-            'total_votes_cast': total_all_votes,
-            'president': {
-                'total_votes': 0,
-                'candidates': []
-            },
-            'gensec': {
-                'total_votes': 0,
-                'candidates': []
-            }
-        }
-        
-        if president_position:
-            president_votes = AnonymousElectionVote.objects.filter(position=president_position).count()
-            stats['president']['total_votes'] = president_votes
-            
-            candidates = ElectionCandidate.objects.filter(
-                position=president_position, 
-                is_active=True
-            ).order_by('-vote_count')
-            
-            for candidate in candidates:
-                stats['president']['candidates'].append({
-                    'name': candidate.name,
-                    'votes': candidate.vote_count,
-                    'percentage': candidate.get_vote_percentage()
-                })
-        
-        if gensec_position:
-            gensec_votes = AnonymousElectionVote.objects.filter(position=gensec_position).count()
-            stats['gensec']['total_votes'] = gensec_votes
-            
-            candidates = ElectionCandidate.objects.filter(
-                position=gensec_position, 
-                is_active=True
-            ).order_by('-vote_count')
-            
-            for candidate in candidates:
-                stats['gensec']['candidates'].append({
-                    'name': candidate.name,
-                    'votes': candidate.vote_count,
-                    'percentage': candidate.get_vote_percentage()
-                })
-        
-        return Response(stats)
+        final_session = final_results.finalized_session()
+        if final_session is not None:
+            etag = f'"final-{final_session.id}"'
+            if request.headers.get('If-None-Match') == etag:
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                response = Response(final_results.get_payload(final_session, 'live_stats', final_results.live_stats))
+            response['ETag'] = etag
+            response['Cache-Control'] = f'public, max-age={settings.FINAL_RESULTS_CACHE_SECONDS}'
+            return response
+
+        version, stats = live_results.get_rendered_results()
+        etag = f'"results-{version}"'
+
+        if request.headers.get('If-None-Match') == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(stats)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         return Response({"error": str(e)}, status=500)
@@ -693,6 +1023,7 @@ Since it's open source, there's endless room for creativity and innovation for f
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
+@throttle_classes([GitHubThrottle])
 def github_contributors_basic(request):
     """Get basic GitHub contributor info (names, avatars) - lightweight and fast"""
     try:
@@ -782,6 +1113,7 @@ def github_contributors_basic(request):
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
+@throttle_classes([GitHubThrottle])
 def github_contributors_commits(request):
     """Get commit counts for specific contributors - fastest stat to load"""
     try:
@@ -870,6 +1202,7 @@ def github_contributors_commits(request):
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
+@throttle_classes([GitHubThrottle])
 def github_contributors_lines(request):
     """Get line addition/deletion stats for specific contributors"""
     try:
@@ -943,6 +1276,7 @@ def github_contributors_lines(request):
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
+@throttle_classes([GitHubThrottle])
 def github_contributors_prs(request):
     """Get pull request stats for specific contributors"""
     try:
@@ -1027,6 +1361,7 @@ def github_contributors_prs(request):
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
+@throttle_classes([GitHubThrottle])
 def debug_contributor(request):
     """Debug endpoint to check individual contributor data"""
     try:
@@ -1103,6 +1438,7 @@ def debug_contributor(request):
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
+@throttle_classes([GitHubThrottle])
 def github_contributors_details(request):
     """Get detailed stats for specific contributors - called after basic info loads"""
     try:
@@ -1206,6 +1542,7 @@ def github_contributors_details(request):
         return Response({"error": str(e)}, status=500)
 
 @api_view(["GET"])
+@throttle_classes([GitHubThrottle])
 def github_contributors(request):
     """Get GitHub contributors for all repositories using GitHub API"""
     try:
@@ -0,0 +1,218 @@
+"""
+Append-only Merkle log of anonymous election votes.
+
+Every AnonymousElectionVote becomes a leaf in log order. Tree nodes are stored
+by (level, index), so appending a batch of k votes only rewrites the O(k + log n)
+nodes on the right edge of the tree, and an inclusion proof is the O(log n)
+siblings on a leaf's path to the root. Hashing follows RFC 6962: leaves are
+SHA-256(0x00 || data) and interior nodes SHA-256(0x01 || left || right), and a
+node without a right child carries its left child's hash up unchanged. A
+checkpoint with the tree size and root hash is published after each batch.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import AnonymousElectionVote, VoteLogNode, VoteLogCheckpoint
+
+LOCK_CACHE_KEY = 'election:vote-log:lock'
+
+# ========== HASHING ==========
+
+def leaf_data(voter_hash, candidate_id, position_id, vote_signature):
+    return f"{voter_hash}:{candidate_id}:{position_id}:{vote_signature}".encode()
+
+def leaf_hash(data):
+    return hashlib.sha256(b'\x00' + data).hexdigest()
+
+def node_hash(left, right):
+    return hashlib.sha256(b'\x01' + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+def vote_leaf_hash(vote):
+    return leaf_hash(leaf_data(vote.voter_hash, vote.candidate_id, vote.position_id, vote.vote_signature))
+
+def root_from_proof(leaf, path):
+    """Recompute the root from a leaf hash and its audit path"""
+    current = leaf
+    for step in path:
+        if step['side'] == 'left':
+            current = node_hash(step['hash'], current)
+        else:
+            current = node_hash(current, step['hash'])
+    return current
+
+
+class StreamingTreeHash:
+    """
+    RFC 6962 Merkle tree hash computed over leaves fed in order, holding only one
+    pending subtree root per level (O(log n) memory).
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._stack = []  # [(level, hash)], levels strictly decreasing
+
+    def add(self, leaf):
+        self.size += 1
+        level, current = 0, leaf
+        while self._stack and self._stack[-1][0] == level:
+            _, left = self._stack.pop()
+            current = node_hash(left, current)
+            level += 1
+        self._stack.append((level, current))
+
+    def root(self):
+        if not self._stack:
+            return hashlib.sha256(b'').hexdigest()
+        current = self._stack[-1][1]
+        for _, left in reversed(self._stack[:-1]):
+            current = node_hash(left, current)
+        return current
+
+# ========== APPENDING ==========
+
+def latest_checkpoint():
+    return VoteLogCheckpoint.objects.order_by('-tree_size').first()
+
+def _level_count(tree_size, level):
+    """Number of nodes at a level of a tree with tree_size leaves"""
+    return ((tree_size - 1) >> level) + 1
+
+def append_pending_votes(batch_size=1000):
+    """
+    Append up to batch_size votes that are not in the log yet, in id order.
+    Returns the new checkpoint, or None if there was nothing to append or
+    another process is appending.
+    """
+    if not cache.add(LOCK_CACHE_KEY, True, 60):
+        return None
+
+    try:
+        with transaction.atomic():
+            votes = list(
+                AnonymousElectionVote.objects.filter(log_index__isnull=True)
+                .order_by('id')
+                .only('id', 'voter_hash', 'candidate_id', 'position_id', 'vote_signature')[:batch_size]
+            )
+            if not votes:
+                return None
+
+            checkpoint = latest_checkpoint()
+            old_size = checkpoint.tree_size if checkpoint else 0
+            new_size = old_size + len(votes)
+
+            # Every node whose leaf range touches [old_size, new_size) changes.
+            # Their children are either new in this batch or, at most once per
+            # level, the untouched left sibling of the first changed node.
+            levels = {0: {}}
+            for offset, vote in enumerate(votes):
+                vote.log_index = old_size + offset
+                levels[0][vote.log_index] = vote_leaf_hash(vote)
+
+            top_level = (new_size - 1).bit_length()
+            old_siblings = Q()
+            for level in range(top_level):
+                first = old_size >> level
+                if first % 2 == 1:
+                    old_siblings |= Q(level=level, node_index=first - 1)
+            existing = {}
+            if old_siblings:
+                existing = {
+                    (level, index): value
+                    for level, index, value in VoteLogNode.objects.filter(old_siblings)
+                    .values_list('level', 'node_index', 'hash')
+                }
+
+            for level in range(1, top_level + 1):
+                below = levels[level - 1]
+                below_count = _level_count(new_size, level - 1)
+                levels[level] = {}
+                for index in range(old_size >> level, _level_count(new_size, level)):
+                    left_index, right_index = 2 * index, 2 * index + 1
+                    left = below.get(left_index) or existing[(level - 1, left_index)]
+                    if right_index < below_count:
+                        levels[level][index] = node_hash(left, below[right_index])
+                    else:
+                        levels[level][index] = left
+
+            VoteLogNode.objects.bulk_create(
+                [
+                    VoteLogNode(level=level, node_index=index, hash=value)
+                    for level, nodes in levels.items()
+                    for index, value in nodes.items()
+                ],
+                update_conflicts=True,
+                unique_fields=['level', 'node_index'],
+                update_fields=['hash'],
+                batch_size=1000,
+            )
+            AnonymousElectionVote.objects.bulk_update(votes, ['log_index'], batch_size=1000)
+
+            return VoteLogCheckpoint.objects.create(
+                tree_size=new_size,
+                root_hash=levels[top_level][0],
+            )
+    finally:
+        cache.delete(LOCK_CACHE_KEY)
+
+def append_all_pending_votes(batch_size=1000):
+    """Append batches until the log has caught up; returns the last checkpoint created"""
+    checkpoint = None
+    while True:
+        appended = append_pending_votes(batch_size)
+        if appended is None:
+            return checkpoint
+        checkpoint = appended
+
+# ========== PROOFS ==========
+
+def _inclusion_proof(log_index, tree_size):
+    path_nodes = []
+    for level in range((tree_size - 1).bit_length()):
+        sibling = (log_index >> level) ^ 1
+        if sibling < _level_count(tree_size, level):
+            path_nodes.append((level, sibling))
+
+    query = Q()
+    for level, index in path_nodes:
+        query |= Q(level=level, node_index=index)
+    query |= Q(level=0, node_index=log_index)
+    hashes = {
+        (level, index): value
+        for level, index, value in VoteLogNode.objects.filter(query).values_list('level', 'node_index', 'hash')
+    }
+
+    path = [
+        {'hash': hashes[(level, index)], 'side': 'left' if index % 2 == 0 else 'right'}
+        for level, index in path_nodes
+    ]
+    return hashes[(0, log_index)], path
+
+def get_inclusion_proof(vote, attempts=3):
+    """
+    Inclusion proof of a logged vote against the latest checkpoint, or None if
+    the vote hasn't been appended yet. The proof is checked against the
+    checkpoint root before it is returned, retrying if an append landed
+    between reading the checkpoint and the nodes.
+    """
+    if vote.log_index is None:
+        return None
+
+    for _ in range(attempts):
+        checkpoint = latest_checkpoint()
+        if checkpoint is None or vote.log_index >= checkpoint.tree_size:
+            return None
+
+        leaf, path = _inclusion_proof(vote.log_index, checkpoint.tree_size)
+        if leaf == vote_leaf_hash(vote) and root_from_proof(leaf, path) == checkpoint.root_hash:
+            return {
+                'log_index': vote.log_index,
+                'leaf_hash': leaf,
+                'tree_size': checkpoint.tree_size,
+                'root_hash': checkpoint.root_hash,
+                'path': path,
+            }
+
+    raise RuntimeError("Vote log proof does not match the published root")
@@ -0,0 +1,85 @@
+"""
+Per-session partitions of the anonymous votes table.
+
+On PostgreSQL, migration 0013 turns main_anonymouselectionvote into a table
+partitioned by LIST (session_id) with one partition per VotingSession and a
+DEFAULT partition as a safety net. Only the live election's partition and its
+indexes are hot, and a finished election's partition can be detached and moved
+to the archive schema without rewriting any rows. Other databases keep a plain
+table and every function here is a no-op.
+"""
+from django.db import connection
+
+from .models import AnonymousElectionVote
+
+ARCHIVE_SCHEMA = 'archive'
+
+def _parent_table():
+    return AnonymousElectionVote._meta.db_table
+
+def partition_name(session_id):
+    return f"{_parent_table()}_s{int(session_id)}"
+
+def is_partitioned():
+    """True when the votes table is a PostgreSQL partitioned table"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relkind FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = %s AND n.nspname = current_schema()",
+            [_parent_table()]
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == 'p'
+
+def ensure_partition(session_id):
+    """Create the votes partition for a session if the table is partitioned"""
+    if not is_partitioned():
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {qn(partition_name(session_id))} "
+            f"PARTITION OF {qn(_parent_table())} FOR VALUES IN ({int(session_id)})"
+        )
+
+def attached_session_ids():
+    """Session ids that currently have an attached votes partition"""
+    if not is_partitioned():
+        return set()
+    prefix = f"{_parent_table()}_s"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = %s",
+            [_parent_table()]
+        )
+        names = [name for (name,) in cursor.fetchall()]
+    return {int(name[len(prefix):]) for name in names if name.startswith(prefix) and name[len(prefix):].isdigit()}
+
+def archive_partition(session_id):
+    """
+    Detach a session's votes partition and move it to the archive schema as a
+    standalone table. Its foreign keys are dropped so the archived votes don't
+    pin candidates, positions or the session. Returns the archived table name.
+    """
+    qn = connection.ops.quote_name
+    table = partition_name(session_id)
+    with connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {qn(_parent_table())} DETACH PARTITION {qn(table)}")
+
+        cursor.execute(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table]
+        )
+        for (constraint,) in cursor.fetchall():
+            cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(constraint)}")
+
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {qn(ARCHIVE_SCHEMA)}")
+        cursor.execute(f"ALTER TABLE {qn(table)} SET SCHEMA {qn(ARCHIVE_SCHEMA)}")
+    return f"{ARCHIVE_SCHEMA}.{table}"
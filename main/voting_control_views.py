@@ -1,9 +1,47 @@
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from .models import VotingSession
+from . import session_cache
+
+VOTING_TYPES = ['su_election', 'huel_voting', 'department_club']
+
+# ========== VOTING STATUS HELPERS ==========
+
+def voting_status(voting_type):
+    """Status of a voting type as shown to clients, from the session cache"""
+    voting_session = session_cache.current(voting_type)
+    if voting_session is not None:
+        status_info, message = voting_session.get_current_status()
+        return {
+            'status': status_info,
+            'message': message,
+            'is_voting_allowed': voting_session.is_voting_allowed(),
+            'session_name': voting_session.name,
+            'start_time': voting_session.voting_start_time,
+            'end_time': voting_session.voting_end_time,
+        }
+    return {
+        'status': 'inactive',
+        'message': 'Voting session not configured.',
+        'is_voting_allowed': False,
+        'session_name': None,
+        'start_time': None,
+        'end_time': None,
+    }
+
+def all_voting_statuses():
+    return {voting_type: voting_status(voting_type) for voting_type in VOTING_TYPES}
+
+def status_version(statuses):
+    """Short hash of a status payload; any transition or admin change gives a new one"""
+    body = json.dumps(statuses, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode()).hexdigest()[:16]
 
 # ========== VOTING CONTROL ENDPOINTS ==========
 
@@ -14,29 +52,12 @@ def get_voting_status(request, voting_type):
     Get current voting status for a specific voting type
     Returns voting status and appropriate message for display
     """
-    try:
-        voting_session = VotingSession.objects.get(voting_type=voting_type)
-        status_info, message = voting_session.get_current_status()
-        
-        return Response({
-            'voting_type': voting_type,
-            'status': status_info,
-            'message': message,
-            'is_voting_allowed': voting_session.is_voting_allowed(),
-            'session_name': voting_session.name,
-            'start_time': voting_session.voting_start_time,
-            'end_time': voting_session.voting_end_time,
-        })
-    except VotingSession.DoesNotExist:
-        return Response({
-            'voting_type': voting_type,
-            'status': 'inactive',
-            'message': 'Voting session not configured.',
-            'is_voting_allowed': False,
-            'session_name': None,
-            'start_time': None,
-            'end_time': None,
-        })
+    voting_status_info = voting_status(voting_type)
+    return Response({
+        'voting_type': voting_type,
+        **voting_status_info,
+        'version': status_version(voting_status_info),
+    })
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
@@ -44,29 +65,8 @@ def get_all_voting_statuses(request):
     """
     Get voting status for all configured voting types
     """
-    statuses = {}
-    voting_types = ['su_election', 'huel_voting', 'department_club']
-    
-    for voting_type in voting_types:
-        try:
-            voting_session = VotingSession.objects.get(voting_type=voting_type)
-            status_info, message = voting_session.get_current_status()
-            statuses[voting_type] = {
-                'status': status_info,
-                'message': message,
-                'is_voting_allowed': voting_session.is_voting_allowed(),
-                'session_name': voting_session.name,
-                'start_time': voting_session.voting_start_time,
-                'end_time': voting_session.voting_end_time,
-            }
-        except VotingSession.DoesNotExist:
-            statuses[voting_type] = {
-                'status': 'inactive',
-                'message': 'Voting session not configured.',
-                'is_voting_allowed': False,
-                'session_name': None,
-                'start_time': None,
-                'end_time': None,
-            }
-    
-    return Response(statuses)
\ No newline at end of file
+    statuses = all_voting_statuses()
+    for voting_status_info in statuses.values():
+        voting_status_info['version'] = status_version(voting_status_info)
+
+    return Response(statuses)
@@ -16,6 +16,7 @@ import os
 from dotenv import load_dotenv
 import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
+from corsheaders.defaults import default_headers
 
 load_dotenv(".env")
 
@@ -54,6 +55,7 @@ CORS_ALLOWED_ORIGINS = [
     "https://pollz.bits-acm.in",
     "https://pollz.online",
 ]
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 SESSION_COOKIE_SECURE = True
 CSRF_COOKIE_SECURE = False
 # Optional: Allow credentials (cookies, authorization headers)
@@ -84,6 +86,7 @@ MIDDLEWARE = [
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "main.middleware.AdmissionControlMiddleware",
 ]
 
 ROOT_URLCONF = "pollz.urls"
@@ -180,8 +183,21 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # simplejwt's JWTAuthentication that also loads the user's profile
+        "main.authentication.ProfileJWTAuthentication",
     ),
+    # Token buckets per user (or hashed IP) in the shared cache, see main/throttling.py
+    "DEFAULT_THROTTLE_CLASSES": (
+        "main.throttling.ReadWriteThrottle",
+    ),
+    "DEFAULT_THROTTLE_RATES": {
+        "read": os.getenv("THROTTLE_READ_RATE", "300/min"),
+        "write": os.getenv("THROTTLE_WRITE_RATE", "30/min"),
+        "github": os.getenv("THROTTLE_GITHUB_RATE", "20/min"),
+        "login": os.getenv("THROTTLE_LOGIN_RATE", "1000/min"),
+    },
+    # nginx appends the client address to X-Forwarded-For; earlier entries are client-supplied
+    "NUM_PROXIES": 1,
 }
 
 
@@ -204,6 +220,56 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=30),
 }
 SESSION_ENGINE = "django.contrib.sessions.backends.db"
+
+# Cache shared by every gunicorn worker and the stream service. It holds locks,
+# counters, throttle buckets and the process cache generations, so it needs atomic
+# add/incr and must not evict at random: Redis (the redis service in docker-compose).
+# Without REDIS_URL (local development, tests) each process gets its own memory cache.
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "OPTIONS": {
+                "MAX_ENTRIES": 50000,
+            },
+        }
+    }
+
+# Election tallies
+VOTE_TALLY_STRIPES = int(os.getenv("VOTE_TALLY_STRIPES", 8))  # Stripe rows per candidate counter
+VOTE_TALLY_CACHE_SECONDS = float(os.getenv("VOTE_TALLY_CACHE_SECONDS", 2))  # Lifetime of the merged tally view
+PROCESS_CACHE_CHECK_SECONDS = float(os.getenv("PROCESS_CACHE_CHECK_SECONDS", 1))  # How stale a worker's cached sessions and positions may get
+VOTING_STATUS_POLL_SECONDS = float(os.getenv("VOTING_STATUS_POLL_SECONDS", 1))  # Long-poll producer tick
+VOTING_STATUS_LONG_POLL_SECONDS = int(os.getenv("VOTING_STATUS_LONG_POLL_SECONDS", 30))  # Longest a status long-poll waits
+RESULTS_SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv("RESULTS_SNAPSHOT_DEBOUNCE_SECONDS", 0.25))  # Coalesce snapshot updates
+RESULTS_SNAPSHOT_MAX_AGE_SECONDS = int(os.getenv("RESULTS_SNAPSHOT_MAX_AGE_SECONDS", 60))  # Full rebuild interval
+RESULTS_STREAM_POLL_SECONDS = float(os.getenv("RESULTS_STREAM_POLL_SECONDS", 0.5))  # Live stream producer tick
+RESULTS_STREAM_HEARTBEAT_SECONDS = int(os.getenv("RESULTS_STREAM_HEARTBEAT_SECONDS", 15))  # Idle keep-alive comment
+FINAL_RESULTS_CACHE_SECONDS = int(os.getenv("FINAL_RESULTS_CACHE_SECONDS", 3600))  # Cache-Control max-age of frozen results
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", 20))  # Default page of the huels and department_clubs lists
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", 100))  # Largest ?limit= of those lists
+HUEL_SUGGEST_MAX_RESULTS = int(os.getenv("HUEL_SUGGEST_MAX_RESULTS", 10))  # Default and largest ?limit= of huels/suggest/
+
+# Vote ingestion: "direct" writes ballots straight to AnonymousElectionVote,
+# "queued" stages them for the drain_staged_votes command to batch in
+VOTE_INGESTION_MODE = os.getenv("VOTE_INGESTION_MODE", "direct")
+
+# Overload admission control (main/middleware.py): time queued in front of
+# gunicorn, in seconds, past which low- and normal-priority requests get a 503 with Retry-After
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "True") == "True"
+ADMISSION_LOW_PRIORITY_MAX_DELAY_SECONDS = float(os.getenv("ADMISSION_LOW_PRIORITY_MAX_DELAY_SECONDS", 1))
+ADMISSION_NORMAL_PRIORITY_MAX_DELAY_SECONDS = float(os.getenv("ADMISSION_NORMAL_PRIORITY_MAX_DELAY_SECONDS", 5))
+
+# How long a response is replayed for retries carrying the same Idempotency-Key
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", 24 * 60 * 60))
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET")
 RAZORPAY_WEBHOOK_SECRET = os.getenv("RAZORPAY_WEBHOOK_SECRET")
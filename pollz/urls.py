@@ -7,14 +7,15 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
     TokenVerifyView
 )
+from main.throttling import LoginThrottle
 
 urlpatterns = [
     path('api/hitler/', admin.site.urls),
     path('api/main/', include('main.urls')),
     path('api/superchat/',include('superchat.urls')),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
-    path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
+    path('api/token/', TokenObtainPairView.as_view(throttle_classes=[LoginThrottle]), name='token_obtain_pair'),
+    path('api/token/refresh/', TokenRefreshView.as_view(throttle_classes=[LoginThrottle]), name='token_refresh'),
+    path('api/token/verify/', TokenVerifyView.as_view(throttle_classes=[LoginThrottle]), name='token_verify'),
 ]
 
 # Serve media files during development and production
@@ -1,7 +1,8 @@
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import transaction
+from main.idempotency import idempotent
 from .models import SuperChat
 from django.conf import settings
 from .serializers import SuperChatSerializer
@@ -20,6 +21,7 @@ client = razorpay.Client(auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_S
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@idempotent('superchat-order')
 def create_order(request):
     try:
         data = request.data
@@ -70,6 +72,7 @@ def create_order(request):
         return Response({'error': f'An unexpected error occurred: {str(e)}'}, status=500)
 @csrf_exempt
 @api_view(["POST"])
+@throttle_classes([])  # Payment provider callbacks must never be rejected
 def razorpay_webhook(request):
     try:
         received_signature = request.headers.get('X-Razorpay-Signature')